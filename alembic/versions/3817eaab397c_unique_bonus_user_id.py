@@ -0,0 +1,59 @@
+"""unique bonus.user_id
+
+Revision ID: 3817eaab397c
+Revises: 7e86be98d751
+Create Date: 2026-10-17 10:12:40.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '3817eaab397c'
+down_revision = '7e86be98d751'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Fusionne les bonus en double puis impose un bonus par utilisateur."""
+    # 1) Regroupe les doublons sur la ligne la plus ancienne
+    op.execute(
+        """
+        WITH agg AS (
+            SELECT user_id,
+                   MIN(id) AS keep_id,
+                   SUM(total_points) AS total_points,
+                   SUM(points_restants) AS points_restants,
+                   SUM(COALESCE(valeur_equivalente, 0)) AS valeur_equivalente,
+                   MAX(last_claim_at) AS last_claim_at
+            FROM bonus
+            GROUP BY user_id
+            HAVING COUNT(*) > 1
+        )
+        UPDATE bonus b
+        SET total_points = agg.total_points,
+            points_restants = agg.points_restants,
+            valeur_equivalente = agg.valeur_equivalente,
+            last_claim_at = agg.last_claim_at
+        FROM agg
+        WHERE b.id = agg.keep_id
+        """
+    )
+
+    # 2) Supprime les lignes fusionnées
+    op.execute(
+        """
+        DELETE FROM bonus b
+        USING bonus k
+        WHERE b.user_id = k.user_id
+          AND b.id > k.id
+        """
+    )
+
+    # 3) Contrainte d'unicité (même nom que create_all)
+    op.create_unique_constraint('bonus_user_id_key', 'bonus', ['user_id'])
+
+
+def downgrade() -> None:
+    """Supprime la contrainte d'unicité (les doublons fusionnés ne sont pas restaurés)."""
+    op.drop_constraint('bonus_user_id_key', 'bonus', type_='unique')
@@ -0,0 +1,36 @@
+"""add game_states
+
+Revision ID: 5c2f8e1a9d34
+Revises: a41c9e2d7b10
+Create Date: 2026-10-17 13:20:05.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '5c2f8e1a9d34'
+down_revision = 'a41c9e2d7b10'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Table des parties en cours (GAME_STATE_BACKEND=postgres)."""
+    op.create_table(
+        'game_states',
+        sa.Column('key', sa.String(length=80), nullable=False),
+        sa.Column('kind', sa.String(length=20), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('payload', sa.JSON(), nullable=False),
+        sa.Column('version', sa.Integer(), nullable=False),
+        sa.Column('expires_at', sa.DateTime(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), server_default=sa.text('now()'), nullable=True),
+        sa.PrimaryKeyConstraint('key'),
+    )
+    op.create_index('ix_game_states_expires_at', 'game_states', ['expires_at'])
+
+
+def downgrade() -> None:
+    """Supprime la table game_states."""
+    op.drop_index('ix_game_states_expires_at', table_name='game_states')
+    op.drop_table('game_states')
@@ -0,0 +1,49 @@
+"""add mining_daily_rollup
+
+Revision ID: 9b4d7f0c2e61
+Revises: 5c2f8e1a9d34
+Create Date: 2026-10-17 14:42:18.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '9b4d7f0c2e61'
+down_revision = '5c2f8e1a9d34'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Table des cumuls journaliers + remplissage depuis mining_history."""
+    op.create_table(
+        'mining_daily_rollup',
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('source', sa.String(length=50), nullable=False),
+        sa.Column('total_points', sa.BigInteger(), nullable=False),
+        sa.Column('entries', sa.Integer(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('user_id', 'day', 'source'),
+    )
+
+    # Historique existant (jour UTC, source NULL -> 'unknown')
+    op.execute(
+        """
+        INSERT INTO mining_daily_rollup (user_id, day, source, total_points, entries)
+        SELECT user_id,
+               created_at::date,
+               COALESCE(source, 'unknown'),
+               SUM(points),
+               COUNT(*)
+        FROM mining_history
+        WHERE created_at IS NOT NULL
+        GROUP BY user_id, created_at::date, COALESCE(source, 'unknown')
+        """
+    )
+
+
+def downgrade() -> None:
+    """Supprime la table des cumuls journaliers."""
+    op.drop_table('mining_daily_rollup')
@@ -0,0 +1,101 @@
+"""add per-user lookup indexes
+
+Revision ID: a41c9e2d7b10
+Revises: 3817eaab397c
+Create Date: 2026-10-17 11:03:12.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'a41c9e2d7b10'
+down_revision = '3817eaab397c'
+branch_labels = None
+depends_on = None
+
+
+# (nom, table, colonnes, options)
+INDEXES = [
+    ("ix_minagetem_user_id_unclaimed", "minagetem", ["user_id"],
+     {"postgresql_where": sa.text("claimed = false")}),
+    ("ix_mining_history_user_id_created_at", "mining_history",
+     ["user_id", sa.text("created_at DESC"), sa.text("id DESC")], {}),
+    ("uq_user_tasks_user_id_task_id", "user_tasks", ["user_id", "task_id"], {"unique": True}),
+    ("ix_user_daily_tasks_user_pack_id", "user_daily_tasks", ["user_pack_id"], {}),
+    ("ix_user_daily_tasks_user_id", "user_daily_tasks", ["user_id"], {}),
+    ("ix_daily_tasks_pack_id", "daily_tasks", ["pack_id"], {}),
+    ("ix_friends_user_id_status", "friends", ["user_id", "status"], {}),
+    ("ix_friends_friend_id", "friends", ["friend_id"], {}),
+    ("ix_user_packs_user_id_pack_id", "user_packs", ["user_id", "pack_id"], {}),
+    ("ix_user_actions_user_id_action_id", "user_actions", ["user_id", "action_id"], {}),
+    ("ix_promo_codes_user_id", "promo_codes", ["user_id"], {}),
+]
+
+
+def _is_invalid(name: str):
+    """True si l'index existe mais est INVALID (build CONCURRENTLY interrompu), None s'il n'existe pas."""
+    row = op.get_bind().execute(
+        sa.text(
+            """
+            SELECT NOT i.indisvalid
+            FROM pg_index i
+            JOIN pg_class c ON c.oid = i.indexrelid
+            WHERE c.relname = :name AND pg_catalog.pg_table_is_visible(c.oid)
+            """
+        ),
+        {"name": name},
+    ).first()
+    return None if row is None else row[0]
+
+
+def upgrade() -> None:
+    """Index par utilisateur, construits en CONCURRENTLY (sans verrou d'écriture)."""
+    # Doublons user_tasks : on garde la ligne complétée, sinon la plus ancienne
+    op.execute(
+        """
+        DELETE FROM user_tasks ut
+        USING user_tasks keep
+        WHERE ut.user_id = keep.user_id
+          AND ut.task_id = keep.task_id
+          AND ut.id <> keep.id
+          AND (keep.completed, -keep.id) > (ut.completed, -ut.id)
+        """
+    )
+
+    # CREATE INDEX CONCURRENTLY est interdit dans une transaction
+    with op.get_context().autocommit_block():
+        for name, table, columns, options in INDEXES:
+            # un index INVALID laissé par un essai précédent satisferait IF NOT EXISTS
+            # sans jamais servir ni garantir l'unicité : on le supprime avant de reconstruire
+            if _is_invalid(name):
+                op.drop_index(name, table_name=table, postgresql_concurrently=True)
+
+            op.create_index(
+                name,
+                table,
+                columns,
+                postgresql_concurrently=True,
+                if_not_exists=True,
+                **options,
+            )
+
+            # doublon inséré entre le DELETE et le build (autre transaction) :
+            # l'index reste INVALID -> on échoue bruyamment plutôt que de le laisser en place
+            if _is_invalid(name):
+                op.drop_index(name, table_name=table, postgresql_concurrently=True)
+                raise RuntimeError(
+                    f"❌ Index {name} invalide après CREATE INDEX CONCURRENTLY sur {table} "
+                    f"(doublons concurrents ?) : index supprimé, relancer la migration."
+                )
+
+
+def downgrade() -> None:
+    """Supprime les index ajoutés."""
+    with op.get_context().autocommit_block():
+        for name, table, _columns, _options in reversed(INDEXES):
+            op.drop_index(
+                name,
+                table_name=table,
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
@@ -0,0 +1,65 @@
+"""add ledger_entries and ledger_snapshots
+
+Revision ID: c7e1a5b3f820
+Revises: 9b4d7f0c2e61
+Create Date: 2026-10-17 15:31:47.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'c7e1a5b3f820'
+down_revision = '9b4d7f0c2e61'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Journal append-only + snapshots de compaction."""
+    op.create_table(
+        'ledger_entries',
+        sa.Column('id', sa.BigInteger(), nullable=False),
+        sa.Column('account', sa.String(length=20), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('entry_type', sa.String(length=40), nullable=False),
+        sa.Column('delta', sa.Numeric(precision=20, scale=6), nullable=False),
+        sa.Column('reference', sa.String(length=100), nullable=True),
+        sa.Column('created_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(
+        'ix_ledger_entries_account_user_id_id',
+        'ledger_entries',
+        ['account', 'user_id', 'id'],
+    )
+
+    op.create_table(
+        'ledger_snapshots',
+        sa.Column('account', sa.String(length=20), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('amount', sa.Numeric(precision=20, scale=6), nullable=False),
+        sa.Column('last_entry_id', sa.BigInteger(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+        sa.PrimaryKeyConstraint('account', 'user_id'),
+    )
+
+    # Soldes existants = snapshot d'ouverture (last_entry_id = 0)
+    op.execute(
+        """
+        INSERT INTO ledger_snapshots (account, user_id, amount, last_entry_id)
+        SELECT 'balance', user_id, points, 0 FROM balance
+        UNION ALL
+        SELECT 'wallet', user_id, amount, 0 FROM wallet
+        UNION ALL
+        SELECT 'real_cash', user_id, cash_balance, 0 FROM real_cash
+        UNION ALL
+        SELECT 'bonus', user_id, points_restants, 0 FROM bonus
+        """
+    )
+
+
+def downgrade() -> None:
+    """Supprime le journal et les snapshots."""
+    op.drop_table('ledger_snapshots')
+    op.drop_index('ix_ledger_entries_account_user_id_id', table_name='ledger_entries')
+    op.drop_table('ledger_entries')
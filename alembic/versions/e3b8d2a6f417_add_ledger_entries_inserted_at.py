@@ -0,0 +1,36 @@
+"""add ledger_entries.inserted_at (compaction watermark)
+
+Revision ID: e3b8d2a6f417
+Revises: c7e1a5b3f820
+Create Date: 2026-10-17 19:12:05.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'e3b8d2a6f417'
+down_revision = 'c7e1a5b3f820'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Heure d'INSERT côté base : la compaction ne se fie plus à created_at (horloge Python)."""
+    op.add_column(
+        'ledger_entries',
+        sa.Column('inserted_at', sa.DateTime(), nullable=True),
+    )
+    # entrées existantes : déjà commitées, created_at suffit
+    op.execute("UPDATE ledger_entries SET inserted_at = created_at")
+    op.alter_column(
+        'ledger_entries',
+        'inserted_at',
+        nullable=False,
+        server_default=sa.text('clock_timestamp()'),
+    )
+    op.create_index('ix_ledger_entries_inserted_at', 'ledger_entries', ['inserted_at'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_ledger_entries_inserted_at', table_name='ledger_entries')
+    op.drop_column('ledger_entries', 'inserted_at')
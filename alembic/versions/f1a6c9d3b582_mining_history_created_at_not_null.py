@@ -0,0 +1,46 @@
+"""mining_history.created_at NOT NULL (keyset pagination)
+
+Revision ID: f1a6c9d3b582
+Revises: e3b8d2a6f417
+Create Date: 2026-10-17 21:04:38.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'f1a6c9d3b582'
+down_revision = 'e3b8d2a6f417'
+branch_labels = None
+depends_on = None
+
+# Date des lignes historiques sans created_at : en fin d'historique
+UNKNOWN_DATE = '1970-01-01 00:00:00'
+
+
+def upgrade() -> None:
+    """Le curseur (created_at, id) ne supporte pas NULL : date sentinelle puis NOT NULL."""
+    # ces lignes étaient exclues du rollup : on les y ajoute sous la même date
+    op.execute(
+        f"""
+        INSERT INTO mining_daily_rollup (user_id, day, source, total_points, entries)
+        SELECT user_id,
+               DATE '{UNKNOWN_DATE[:10]}',
+               COALESCE(source, 'unknown'),
+               SUM(points),
+               COUNT(*)
+        FROM mining_history
+        WHERE created_at IS NULL
+        GROUP BY user_id, COALESCE(source, 'unknown')
+        ON CONFLICT (user_id, day, source) DO UPDATE
+        SET total_points = mining_daily_rollup.total_points + EXCLUDED.total_points,
+            entries = mining_daily_rollup.entries + EXCLUDED.entries
+        """
+    )
+    op.execute(
+        f"UPDATE mining_history SET created_at = TIMESTAMP '{UNKNOWN_DATE}' WHERE created_at IS NULL"
+    )
+    op.alter_column('mining_history', 'created_at', existing_type=sa.DateTime(), nullable=False)
+
+
+def downgrade() -> None:
+    op.alter_column('mining_history', 'created_at', existing_type=sa.DateTime(), nullable=True)
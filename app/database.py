@@ -6,6 +6,8 @@ from dotenv import load_dotenv
 from typing import AsyncGenerator
 import os
 
+from app.utils.sql_stats import InstrumentedPool, instrument_engine, install_pool_liveness, track_pool
+
 # 🔄 Charge les variables d'environnement
 load_dotenv()
 
@@ -14,16 +16,60 @@ DATABASE_URL = os.getenv("DATABASE_URL")
 if not DATABASE_URL:
     raise ValueError("❌ DATABASE_URL manquant dans .env")
 
+# ⚙️ Pool de connexions (voir pool_advisor.py pour dimensionner DB_POOL_SIZE)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 10))              # connexions persistantes
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 20))        # connexions temporaires en cas de charge
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", 30))      # délai max avant "timeout"
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", 1800))      # recycle après 30 min (évite connexions mortes)
+
+# 🩺 Vérification de la connexion au checkout :
+#   always = ping à chaque checkout (pool_pre_ping)
+#   idle   = ping seulement après DB_PRE_PING_IDLE_SECONDS d'inactivité (défaut)
+#   never  = aucun ping (recycle seul)
+DB_PRE_PING = os.getenv("DB_PRE_PING", "idle").lower()
+DB_PRE_PING_IDLE_SECONDS = float(os.getenv("DB_PRE_PING_IDLE_SECONDS", 30))
+
+if DB_PRE_PING not in ("always", "idle", "never"):
+    raise ValueError(f"❌ DB_PRE_PING invalide : {DB_PRE_PING} (always, idle ou never)")
+
+# 📖 Réplique en lecture (optionnelle) :
+#   non défini -> les lectures passent par le primaire (même moteur)
+#   "same"     -> moteur séparé sur DATABASE_URL (doublure locale, tests)
+DATABASE_REPLICA_URL = os.getenv("DATABASE_REPLICA_URL")
+DB_REPLICA_POOL_SIZE = int(os.getenv("DB_REPLICA_POOL_SIZE", DB_POOL_SIZE))
+
+
+def _create_engine(url: str, pool_name: str, pool_size: int):
+    """Moteur async instrumenté (pool configuré par l'environnement)."""
+    new_engine = create_async_engine(
+        url,
+        poolclass=InstrumentedPool,  # ⏱️ mesure l'attente au checkout
+        echo=os.getenv("SQL_ECHO", "false").lower() == "true",  # 🔍 Debug SQL (SQL_ECHO=true)
+        pool_size=pool_size,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_recycle=DB_POOL_RECYCLE,
+        pool_pre_ping=DB_PRE_PING == "always",
+    )
+
+    # 📈 Nombre de requêtes, temps DB et requêtes lentes (remplace echo)
+    instrument_engine(new_engine)
+    track_pool(pool_name, new_engine)
+
+    if DB_PRE_PING == "idle":
+        install_pool_liveness(new_engine, DB_PRE_PING_IDLE_SECONDS)
+
+    return new_engine
+
+
 # 🔌 Moteur asynchrone SQLAlchemy avec gestion du pool
-engine = create_async_engine(
-    DATABASE_URL,
-    echo=True,            # 🔍 Debug SQL (désactive en prod)
-    pool_size=10,         # connexions persistantes
-    max_overflow=20,      # connexions temporaires en cas de charge
-    pool_timeout=30,      # délai max avant "timeout"
-    pool_recycle=1800,    # recycle après 30 min (évite connexions mortes)
-    pool_pre_ping=True,   # vérifie la connexion avant usage
-)
+engine = _create_engine(DATABASE_URL, "primary", DB_POOL_SIZE)
+
+if DATABASE_REPLICA_URL:
+    replica_url = DATABASE_URL if DATABASE_REPLICA_URL == "same" else DATABASE_REPLICA_URL
+    read_engine = _create_engine(replica_url, "replica", DB_REPLICA_POOL_SIZE)
+else:
+    read_engine = engine
 
 # 🏭 Fabrique de sessions async
 AsyncSessionLocal = async_sessionmaker(
@@ -32,6 +78,13 @@ AsyncSessionLocal = async_sessionmaker(
     expire_on_commit=False,
 )
 
+# 📖 Fabrique de sessions en lecture seule (réplique)
+ReadSessionLocal = async_sessionmaker(
+    bind=read_engine,
+    class_=AsyncSession,
+    expire_on_commit=False,
+)
+
 # 📦 Base déclarative pour les modèles SQLAlchemy
 Base: DeclarativeMeta = declarative_base()
 
@@ -1,15 +1,103 @@
 # app/dependencies/auth.py
+import os
+from datetime import datetime
+from typing import Optional
 from fastapi import Depends, HTTPException, status, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from app.database import get_async_session
 from app.models import User
 from app.utils.token import verify_access_token
+from app.utils.ttl_cache import TTLCache
+
+# ⚡ Cache des utilisateurs authentifiés (clé = sujet du token)
+PRINCIPAL_CACHE_TTL_SECONDS = float(os.getenv("PRINCIPAL_CACHE_TTL_SECONDS", 30))
+PRINCIPAL_CACHE_MAX_SIZE = int(os.getenv("PRINCIPAL_CACHE_MAX_SIZE", 10_000))
+
+principal_cache = TTLCache(
+    ttl_seconds=PRINCIPAL_CACHE_TTL_SECONDS,
+    max_size=PRINCIPAL_CACHE_MAX_SIZE,
+)
+
+
+class Principal:
+    """
+    Identité légère de l'utilisateur connecté (colonnes utiles uniquement).
+    Les handlers qui modifient l'utilisateur passent par get_current_user_model.
+    """
+
+    __slots__ = (
+        "id",
+        "email",
+        "username",
+        "is_verified",
+        "has_completed_welcome_tasks",
+        "created_at",
+    )
+
+    def __init__(
+        self,
+        id: int,
+        email: str,
+        username: str,
+        is_verified: bool,
+        has_completed_welcome_tasks: bool,
+        created_at: Optional[datetime],
+    ):
+        self.id = id
+        self.email = email
+        self.username = username
+        self.is_verified = is_verified
+        self.has_completed_welcome_tasks = has_completed_welcome_tasks
+        self.created_at = created_at
+
+    def __repr__(self):
+        return f"<Principal {self.email}>"
+
+
+PRINCIPAL_COLUMNS = (
+    User.id,
+    User.email,
+    User.username,
+    User.is_verified,
+    User.has_completed_welcome_tasks,
+    User.created_at,
+)
+
+
+def invalidate_principal(subject: str) -> None:
+    """
+    Retire un utilisateur du cache (profil modifié, compte créé, déconnexion).
+    """
+    if subject:
+        principal_cache.invalidate(subject)
+
+
+async def resolve_principal(db: AsyncSession, subject: str) -> Optional[Principal]:
+    """
+    Résout le sujet d'un token (email) en Principal.
+    Sert depuis le cache si possible, sinon lit uniquement les colonnes utiles.
+    """
+    principal = principal_cache.get(subject)
+    if principal is not None:
+        return principal
+
+    result = await db.execute(
+        select(*PRINCIPAL_COLUMNS).where(User.email == subject)
+    )
+    row = result.first()
+    if row is None:
+        return None
+
+    principal = Principal(*row)
+    principal_cache.set(subject, principal)
+    return principal
+
 
 async def get_current_user(
     request: Request,
     db: AsyncSession = Depends(get_async_session)
-) -> User:
+) -> Principal:
     """
     Récupère l'utilisateur connecté à partir du cookie access_token.
     """
@@ -28,9 +116,25 @@ async def get_current_user(
             detail="Token invalide",
         )
 
-    result = await db.execute(select(User).where(User.email == email))
-    user = result.scalars().first()
+    principal = await resolve_principal(db, email)
+    if not principal:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Utilisateur non trouvé",
+        )
+    return principal
+
+
+async def get_current_user_model(
+    principal: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_session)
+) -> User:
+    """
+    Charge la ligne User complète (pour les handlers qui la modifient).
+    """
+    user = await db.get(User, principal.id)
     if not user:
+        invalidate_principal(principal.email)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Utilisateur non trouvé",
@@ -0,0 +1,68 @@
+# app/dependencies/read_session.py
+
+# Routage des endpoints de lecture vers la réplique :
+# - get_read_session : session sur ReadSessionLocal (réplique, ou primaire si non configurée)
+# - lecture de ses propres écritures : utilisateurs épinglés au primaire
+#   après un commit (voir app/utils/read_pins.py)
+
+from typing import AsyncGenerator
+
+from fastapi import Request
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import AsyncSessionLocal, ReadSessionLocal, read_engine, engine
+from app.dependencies.auth import principal_cache
+from app.utils.metrics import counter
+from app.utils.read_pins import is_pinned
+from app.utils.token import verify_access_token
+
+read_routing_total = counter(
+    "db_read_routing_total",
+    "Sessions de lecture par destination.",
+    labelnames=("target",),
+)
+
+
+# =========================================================
+# DÉPENDANCE FASTAPI
+# =========================================================
+
+def _use_primary(request: Request) -> bool:
+    if read_engine is engine:
+        return True
+    if request.method not in ("GET", "HEAD"):
+        return True
+
+    # utilisateur concerné : user_id du chemin...
+    path_user_id = request.path_params.get("user_id")
+    if path_user_id is not None:
+        try:
+            return is_pinned(int(path_user_id))
+        except (TypeError, ValueError):
+            return False
+
+    # ... sinon celui du cookie (résolu par get_current_user, donc en cache)
+    token = request.cookies.get("access_token")
+    if not token:
+        return False
+
+    try:
+        subject = verify_access_token(token).get("sub")
+    except Exception:
+        return False
+
+    principal = principal_cache.get(subject) if subject else None
+    if principal is None:
+        # identité inconnue : prudence, primaire
+        return True
+    return is_pinned(principal.id)
+
+
+async def get_read_session(request: Request) -> AsyncGenerator[AsyncSession, None]:
+    """Session de lecture : réplique, sauf lecture de ses propres écritures récentes."""
+    primary = _use_primary(request)
+    read_routing_total.inc(target="primary" if primary else "replica")
+
+    factory = AsyncSessionLocal if primary else ReadSessionLocal
+    async with factory() as session:
+        yield session
@@ -0,0 +1,200 @@
+# app/middleware/idempotency.py
+
+# Idempotence des claims / achats / cashouts (double envoi mobile) :
+# - clé = en-tête Idempotency-Key + méthode + chemin + query + hash du cookie access_token
+# - le hash du corps est gardé avec la réponse : même clé, autre corps -> 422
+# - la première réponse (< 500) est gardée en mémoire (LRU + TTL) et rejouée
+#   telle quelle pour les doublons, sans toucher la base
+# - un doublon qui arrive pendant le traitement attend la première réponse
+# ⚠️ Par process : derrière plusieurs workers, les doublons routés ailleurs
+# retombent sur les gardes existantes (claimed, save conditionnel, etc.).
+
+import asyncio
+import hashlib
+import os
+import re
+from http.cookies import SimpleCookie
+
+from app.utils.ttl_cache import TTLCache
+
+IDEMPOTENCY_HEADER = b"idempotency-key"
+IDEMPOTENCY_TTL_SECONDS = float(os.getenv("IDEMPOTENCY_TTL_SECONDS", 600))
+IDEMPOTENCY_MAX_ENTRIES = int(os.getenv("IDEMPOTENCY_MAX_ENTRIES", 20_000))
+
+# Attente max d'un doublon pendant le traitement de la première requête
+IDEMPOTENCY_WAIT_SECONDS = float(os.getenv("IDEMPOTENCY_WAIT_SECONDS", 30))
+
+# Réponses plus grosses : non mémorisées
+IDEMPOTENCY_MAX_BODY_BYTES = 64 * 1024
+
+IDEMPOTENT_PATHS = [
+    re.compile(p) for p in (
+        r"^/mining/claim/[^/]+$",
+        r"^/actions/buy/[^/]+$",
+        r"^/actions/claim/[^/]+$",
+        r"^/bonus/[^/]+/claim$",
+        r"^/luckygame/cashout$",
+        r"^/tradegame/cashout$",
+    )
+]
+
+
+async def _read_body(receive) -> bytes:
+    body = bytearray()
+    while True:
+        message = await receive()
+        if message["type"] != "http.request":
+            # client déconnecté : corps incomplet
+            break
+        body += message.get("body", b"")
+        if not message.get("more_body", False):
+            break
+    return bytes(body)
+
+
+def _replay_receive(body: bytes, receive):
+    """`receive` qui redonne le corps déjà lu, puis délègue (déconnexion)."""
+    sent = False
+
+    async def replay():
+        nonlocal sent
+        if not sent:
+            sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        return await receive()
+
+    return replay
+
+
+def _identity(headers: dict) -> str:
+    """Empreinte du cookie de session (jamais le jeton en clair)."""
+    cookie_header = headers.get(b"cookie")
+    if not cookie_header:
+        return "anonymous"
+
+    cookie = SimpleCookie()
+    try:
+        cookie.load(cookie_header.decode("latin-1"))
+    except Exception:
+        return "anonymous"
+
+    token = cookie.get("access_token")
+    if token is None:
+        return "anonymous"
+    return hashlib.sha256(token.value.encode()).hexdigest()[:32]
+
+
+class IdempotencyMiddleware:
+    """Middleware ASGI : rejoue la première réponse d'une même clé d'idempotence."""
+
+    def __init__(self, app):
+        self.app = app
+        self.responses = TTLCache(ttl_seconds=IDEMPOTENCY_TTL_SECONDS, max_size=IDEMPOTENCY_MAX_ENTRIES)
+        self._inflight: dict = {}
+        self.replayed = 0
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "POST":
+            return await self.app(scope, receive, send)
+
+        path = scope["path"]
+        if not any(p.match(path) for p in IDEMPOTENT_PATHS):
+            return await self.app(scope, receive, send)
+
+        headers = dict(scope["headers"])
+        client_key = headers.get(IDEMPOTENCY_HEADER)
+        if not client_key:
+            return await self.app(scope, receive, send)
+
+        key = (
+            _identity(headers),
+            path,
+            scope.get("query_string", b""),
+            client_key[:128],
+        )
+
+        # le corps fait partie de la requête (ex. game_id du cashout)
+        body = await _read_body(receive)
+        body_hash = hashlib.sha256(body).digest()
+        receive = _replay_receive(body, receive)
+
+        # 1️⃣ déjà traité
+        cached = self.responses.get(key)
+        if cached is not None:
+            if cached[0] != body_hash:
+                return await self._mismatch(send)
+            return await self._replay(cached[1], send)
+
+        # 2️⃣ en cours de traitement : on attend le résultat
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            pending_hash, pending = inflight
+            if pending_hash != body_hash:
+                return await self._mismatch(send)
+            try:
+                cached = await asyncio.wait_for(asyncio.shield(pending), IDEMPOTENCY_WAIT_SECONDS)
+            except asyncio.TimeoutError:
+                cached = None
+            if cached is not None:
+                return await self._replay(cached, send)
+            return await self._conflict(send)
+
+        # 3️⃣ première requête : on capture la réponse
+        future: asyncio.Future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = (body_hash, future)
+        captured = {"status": None, "headers": [], "body": bytearray(), "too_big": False}
+
+        async def capture_send(message):
+            if message["type"] == "http.response.start":
+                captured["status"] = message["status"]
+                captured["headers"] = list(message.get("headers", []))
+            elif message["type"] == "http.response.body":
+                if len(captured["body"]) + len(message.get("body", b"")) > IDEMPOTENCY_MAX_BODY_BYTES:
+                    captured["too_big"] = True
+                else:
+                    captured["body"] += message.get("body", b"")
+            await send(message)
+
+        result = None
+        try:
+            await self.app(scope, receive, capture_send)
+
+            status = captured["status"]
+            # les erreurs serveur ne sont pas figées : le client peut réessayer
+            if status is not None and status < 500 and not captured["too_big"]:
+                result = (status, captured["headers"], bytes(captured["body"]))
+                self.responses.set(key, (body_hash, result))
+        finally:
+            self._inflight.pop(key, None)
+            if not future.done():
+                future.set_result(result)
+
+    async def _replay(self, cached, send):
+        status, headers, body = cached
+        self.replayed += 1
+        await send({
+            "type": "http.response.start",
+            "status": status,
+            "headers": headers + [(b"idempotent-replayed", b"true")],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+    async def _conflict(self, send):
+        await self._error(send, 409, b'{"detail":"Requete identique en cours ou en echec, reessayez."}')
+
+    async def _mismatch(self, send):
+        await self._error(send, 422, b'{"detail":"Idempotency-Key deja utilisee avec un autre corps de requete."}')
+
+    async def _error(self, send, status: int, body: bytes):
+        await send({
+            "type": "http.response.start",
+            "status": status,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+    def stats(self) -> dict:
+        return {"inflight": len(self._inflight), "replayed": self.replayed, **self.responses.stats()}
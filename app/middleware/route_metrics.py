@@ -0,0 +1,70 @@
+# app/middleware/route_metrics.py
+
+# Latence et débit par route (gabarit, ex. /mining/status/{user_id}) :
+# - histogramme de latence par méthode + route
+# - compteur de réponses par méthode + route + statut
+# - gauge des requêtes en cours
+# Agrégation par worker, sans await sur le chemin chaud (une seule boucle
+# d'événements par process) : /metrics expose les chiffres du worker interrogé.
+
+import time
+
+from app.utils.metrics import counter, gauge, histogram
+
+# Route inconnue (404) : un seul libellé, pour borner la cardinalité
+UNMATCHED_ROUTE = "<unmatched>"
+
+http_request_seconds = histogram(
+    "http_request_duration_seconds",
+    "Latence des requêtes HTTP par route.",
+    labelnames=("method", "route"),
+)
+http_requests_total = counter(
+    "http_requests_total",
+    "Réponses HTTP par route et statut.",
+    labelnames=("method", "route", "status"),
+)
+http_in_flight = gauge("http_requests_in_flight", "Requêtes HTTP en cours.")
+
+
+def _route_template(scope) -> str:
+    # FastAPI place la route résolue dans le scope (APIRoute.matches)
+    route = scope.get("route")
+    path = getattr(route, "path", None)
+    if path:
+        return path
+    root_path = scope.get("root_path", "")
+    if "endpoint" in scope and root_path:
+        # montage (ex. /static) : le préfixe suffit
+        return root_path
+    return UNMATCHED_ROUTE
+
+
+class RouteMetricsMiddleware:
+    """Middleware ASGI : latence, statut et requêtes en cours, par gabarit de route."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        status_code = 500
+        started = time.perf_counter()
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        http_in_flight.inc()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            http_in_flight.dec()
+            route = _route_template(scope)
+            method = scope["method"]
+            http_request_seconds.observe(time.perf_counter() - started, method=method, route=route)
+            http_requests_total.inc(method=method, route=route, status=status_code)
@@ -0,0 +1,68 @@
+# app/middleware/sql_stats.py
+
+# Statistiques SQL par requête HTTP :
+# - nombre de requêtes, temps DB total, requête la plus lente
+# - en-têtes X-DB-Query-Count / X-DB-Time-Ms si SQL_STATS_HEADERS=true (dev)
+# - histogrammes exportés dans tous les cas
+# - journal des requêtes HTTP lentes côté DB, avec le SQL le plus lent
+
+import logging
+import os
+
+from app.utils.metrics import histogram
+from app.utils.sql_stats import QueryStats, current_query_stats
+
+logger = logging.getLogger("app.sql")
+
+SQL_STATS_HEADERS = os.getenv("SQL_STATS_HEADERS", "false").lower() == "true"
+
+# 🐢 Temps SQL cumulé (ms) au-delà duquel la requête HTTP est journalisée
+SLOW_REQUEST_DB_MS = float(os.getenv("SLOW_REQUEST_DB_MS", 500))
+
+# Longueur max du SQL journalisé
+_SQL_PREVIEW_CHARS = 500
+
+db_queries_per_request = histogram(
+    "db_queries_per_request",
+    "Requêtes SQL par requête HTTP.",
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 100),
+)
+db_time_per_request = histogram("db_time_per_request_seconds", "Temps SQL cumulé par requête HTTP.")
+
+
+class SQLStatsMiddleware:
+    """Middleware ASGI : installe un QueryStats pour la durée de la requête."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        stats = QueryStats()
+        token = current_query_stats.set(stats)
+
+        async def send_with_headers(message):
+            if message["type"] == "http.response.start" and SQL_STATS_HEADERS:
+                message = dict(message)
+                message["headers"] = list(message.get("headers", [])) + [
+                    (b"x-db-query-count", str(stats.count).encode()),
+                    (b"x-db-time-ms", f"{stats.total_ms:.1f}".encode()),
+                    (b"x-db-slowest-ms", f"{stats.slowest_ms:.1f}".encode()),
+                ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_headers)
+        finally:
+            current_query_stats.reset(token)
+            db_queries_per_request.observe(stats.count)
+            db_time_per_request.observe(stats.total_ms / 1000)
+
+            if stats.total_ms >= SLOW_REQUEST_DB_MS:
+                logger.warning(
+                    f"[sql] Requête HTTP lente côté DB : {scope['method']} {scope['path']} "
+                    f"{stats.count} requêtes, {stats.total_ms:.1f} ms "
+                    f"(plus lente {stats.slowest_ms:.1f} ms : {(stats.slowest_sql or '')[:_SQL_PREVIEW_CHARS]})"
+                )
@@ -4,4 +4,6 @@ from .social_models import *
 from .task_models import *
 from .mining_models import *
 from .action_models import *
-from .bonus_models import *
\ No newline at end of file
+from .bonus_models import *
+from .game_models import *
+from .ledger_models import *
\ No newline at end of file
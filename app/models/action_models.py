@@ -1,5 +1,5 @@
 import enum
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Boolean, Date
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Boolean, Date, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from sqlalchemy.types import Enum as SqlEnum
@@ -77,6 +77,10 @@ class UserPack(Base):
         cascade="all, delete-orphan"
     )
 
+    __table_args__ = (
+        Index("ix_user_packs_user_id_pack_id", user_id, pack_id),
+    )
+
 
 class UserAction(Base):
     __tablename__ = "user_actions"
@@ -103,6 +107,10 @@ class UserAction(Base):
     action = relationship("Action", back_populates="buyers")
     user = relationship("User", back_populates="user_actions")
 
+    __table_args__ = (
+        Index("ix_user_actions_user_id_action_id", user_id, action_id),
+    )
+
 
 class DailyTask(Base):
     __tablename__ = "daily_tasks"
@@ -125,6 +133,10 @@ class DailyTask(Base):
         cascade="all, delete-orphan"
     )
 
+    __table_args__ = (
+        Index("ix_daily_tasks_pack_id", pack_id),
+    )
+
 
 class UserDailyTask(Base):
     __tablename__ = "user_daily_tasks"
@@ -142,4 +154,9 @@ class UserDailyTask(Base):
 
     task = relationship("DailyTask", back_populates="user_tasks")
 
-    user_pack = relationship("UserPack", back_populates="tasks")
\ No newline at end of file
+    user_pack = relationship("UserPack", back_populates="tasks")
+
+    __table_args__ = (
+        Index("ix_user_daily_tasks_user_pack_id", user_pack_id),
+        Index("ix_user_daily_tasks_user_id", user_id),
+    )
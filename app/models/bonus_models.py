@@ -19,7 +19,8 @@ class Bonus(Base):
     __tablename__ = "bonus"
 
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    # unique : un seul bonus par utilisateur (requis pour l'upsert ON CONFLICT)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, unique=True)
 
     total_points = Column(Numeric(18, 6), default=Decimal("0"), nullable=False)
     points_restants = Column(Numeric(18, 6), default=Decimal("0"), nullable=False)
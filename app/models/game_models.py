@@ -0,0 +1,21 @@
+from sqlalchemy import Column, Integer, String, DateTime, JSON, Index
+from sqlalchemy.sql import func
+from app.database import Base
+
+
+class GameState(Base):
+    """État des parties en cours (backend partagé entre workers)."""
+    __tablename__ = "game_states"
+
+    key = Column(String(80), primary_key=True)  # "<kind>:<game_id>"
+    kind = Column(String(20), nullable=False)
+    user_id = Column(Integer, nullable=False)
+    payload = Column(JSON, nullable=False)
+    version = Column(Integer, nullable=False, default=1)
+    expires_at = Column(DateTime, nullable=False)
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
+
+    __table_args__ = (
+        # purge des parties expirées
+        Index("ix_game_states_expires_at", expires_at),
+    )
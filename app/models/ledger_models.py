@@ -0,0 +1,35 @@
+from sqlalchemy import Column, Integer, BigInteger, String, DateTime, Numeric, Index
+from sqlalchemy.sql import func
+from app.database import Base
+
+
+class LedgerEntry(Base):
+    """Journal append-only des mouvements (balance, wallet, real_cash, bonus)."""
+    __tablename__ = "ledger_entries"
+
+    id = Column(BigInteger, primary_key=True)
+    account = Column(String(20), nullable=False)
+    user_id = Column(Integer, nullable=False)
+    entry_type = Column(String(40), nullable=False)
+    delta = Column(Numeric(20, 6), nullable=False)
+    reference = Column(String(100), nullable=True)
+    created_at = Column(DateTime, server_default=func.now(), nullable=False)
+    # heure réelle de l'INSERT (côté base) : filigrane de compaction
+    inserted_at = Column(DateTime, server_default=func.clock_timestamp(), nullable=False)
+
+    __table_args__ = (
+        # solde = snapshot + somme des entrées après le snapshot
+        Index("ix_ledger_entries_account_user_id_id", account, user_id, id),
+        Index("ix_ledger_entries_inserted_at", inserted_at),
+    )
+
+
+class LedgerSnapshot(Base):
+    """Solde cumulé d'un compte jusqu'à `last_entry_id` (compaction du journal)."""
+    __tablename__ = "ledger_snapshots"
+
+    account = Column(String(20), primary_key=True)
+    user_id = Column(Integer, primary_key=True)
+    amount = Column(Numeric(20, 6), nullable=False)
+    last_entry_id = Column(BigInteger, nullable=False)
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now(), nullable=False)
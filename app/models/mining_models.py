@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, BigInteger, String, Date, Boolean, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, BigInteger, String, Date, Boolean, DateTime, ForeignKey, Index, false
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.database import Base
@@ -15,6 +15,11 @@ class MineTimer(Base):
     created_at = Column(DateTime, server_default=func.now())
     updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
 
+    __table_args__ = (
+        # minage en cours (status / start / claim)
+        Index("ix_minagetem_user_id_unclaimed", user_id, postgresql_where=(claimed == false())),
+    )
+
 
 class MiningHistory(Base):
     __tablename__ = "mining_history"
@@ -23,10 +28,28 @@ class MiningHistory(Base):
     user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     points = Column(Integer, nullable=False)
     source = Column(String(50), nullable=True)
-    created_at = Column(DateTime, server_default=func.now())
+    # NOT NULL : clé de pagination (created_at, id)
+    created_at = Column(DateTime, server_default=func.now(), nullable=False)
 
     user = relationship("User", back_populates="mining_histories")
 
+    __table_args__ = (
+        # historique paginé par utilisateur, du plus récent au plus ancien
+        Index("ix_mining_history_user_id_created_at", user_id, created_at.desc(), id.desc()),
+    )
+
+
+class MiningDailyRollup(Base):
+    """Totaux de MiningHistory par utilisateur, jour (UTC) et source."""
+    __tablename__ = "mining_daily_rollup"
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    day = Column(Date, primary_key=True)
+    source = Column(String(50), primary_key=True)
+    total_points = Column(BigInteger, nullable=False, default=0)
+    entries = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now(), nullable=False)
+
 
 class DailyCheckIn(Base):
     __tablename__ = "daily_checkins"
@@ -1,4 +1,4 @@
-from sqlalchemy import Column,Integer,String,DateTime,ForeignKey
+from sqlalchemy import Column,Integer,String,DateTime,ForeignKey,Index
 from sqlalchemy.sql import func
 from app.database import Base
 
@@ -13,6 +13,11 @@ class Friend(Base):
     created_at = Column(DateTime, server_default=func.now())
     updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
 
+    __table_args__ = (
+        Index("ix_friends_user_id_status", user_id, status),
+        Index("ix_friends_friend_id", friend_id),
+    )
+
 
 class Status(Base):
     __tablename__ = "status"
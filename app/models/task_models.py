@@ -1,4 +1,4 @@
-from sqlalchemy import Column,Integer,String,Boolean,DateTime,ForeignKey
+from sqlalchemy import Column,Integer,String,Boolean,DateTime,ForeignKey,Index
 from sqlalchemy.sql import func
 from app.database import Base
 
@@ -27,4 +27,8 @@ class UserTask(Base):
     started_at = Column(DateTime, nullable=True)
     completed = Column(Boolean, default=False, nullable=False)
     completed_at = Column(DateTime)
-    created_at = Column(DateTime, server_default=func.now())
\ No newline at end of file
+    created_at = Column(DateTime, server_default=func.now())
+
+    __table_args__ = (
+        Index("uq_user_tasks_user_id_task_id", user_id, task_id, unique=True),
+    )
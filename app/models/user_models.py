@@ -1,4 +1,4 @@
-from sqlalchemy import Column,String,Integer,Date,Boolean,DateTime,ForeignKey
+from sqlalchemy import Column,String,Integer,Date,Boolean,DateTime,ForeignKey,Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.database import Base
@@ -62,4 +62,8 @@ class PromoCode(Base):
     is_active = Column(Boolean, default=True, nullable=False)
     usage_limit = Column(Integer, default=0)
     used_count = Column(Integer, default=0)
-    created_at = Column(DateTime, server_default=func.now())
\ No newline at end of file
+    created_at = Column(DateTime, server_default=func.now())
+
+    __table_args__ = (
+        Index("ix_promo_codes_user_id", user_id),
+    )
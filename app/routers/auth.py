@@ -14,12 +14,15 @@ from typing import Optional
 
 from app.models import PendingUser, User, PromoCode, Friend, RealCash, Wallet
 from app.database import get_async_session
-from app.services.VerifyEmail import generate_code, pwd_context
+from app.services.VerifyEmail import generate_code
+from app.services.password_service import hash_password
 from app.schemas import VerificationSchema
-from app.utils.token import create_access_token, create_refresh_token, verify_refresh_token
+from app.utils.token import (
+    create_access_token, create_refresh_token, verify_refresh_token, decode_access_token
+)
 from app.utils.auth_utils import get_user_by_email
 from app.services.rewards import reward_referrer
-from app.dependencies.auth import get_current_user
+from app.dependencies.auth import get_current_user_model, invalidate_principal
 from app.utils.cookies import (
     set_access_token_cookie, set_refresh_token_cookie,
     refresh_tokens, clear_access_token_cookie,
@@ -87,7 +90,7 @@ async def register_user(
     except ValueError:
         raise HTTPException(status_code=400, detail="Date invalide. Format attendu : YYYY-MM-DD.")
 
-    hashed_pwd = pwd_context.hash(password)
+    hashed_pwd = await hash_password(password)
     code = generate_code()
     now = datetime.utcnow()
     expiration = timedelta(minutes=5)
@@ -216,6 +219,8 @@ async def verify_email(
         # 🧹 supprimer pending
         await db.delete(pending)
 
+    invalidate_principal(user.email)
+
     # 🔐 génération tokens (hors transaction)
     access_token = create_access_token({"sub": user.email})
     refresh_token = create_refresh_token({"sub": user.email})
@@ -235,7 +240,7 @@ async def verify_email(
 # ============================================================
 
 @router.get("/me")
-async def get_me(request: Request, current_user: User = Depends(get_current_user)):
+async def get_me(request: Request, current_user: User = Depends(get_current_user_model)):
     return {"status": "success", "user": public_user_payload(current_user)}
 
 # ============================================================
@@ -243,7 +248,12 @@ async def get_me(request: Request, current_user: User = Depends(get_current_user
 # ============================================================
 
 @router.post("/logout")
-async def logout():
+async def logout(request: Request):
+    token = request.cookies.get("access_token")
+    payload = decode_access_token(token) if token else None
+    if payload:
+        invalidate_principal(payload.get("sub"))
+
     response = JSONResponse({"status": "success", "detail": "Déconnecté"})
     clear_access_token_cookie(response)
     response.delete_cookie("refresh_token", path="/")
@@ -6,7 +6,7 @@ from sqlalchemy import select, or_
 from app.database import get_async_session
 from app.models import User
 from app.schemas import LoginRequest
-from app.services.VerifyEmail import pwd_context
+from app.services.password_service import verify_password
 from app.utils.token import create_access_token, create_refresh_token
 from app.utils.cookies import set_access_token_cookie, set_refresh_token_cookie
 
@@ -67,7 +67,7 @@ async def login_user(
 
     # ── 3) Vérification du mot de passe
     print("password bytes =", len(password.encode("utf-8")))
-    if not pwd_context.verify(password, user.password_hash):
+    if not await verify_password(password, user.password_hash):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Identifiants invalides."
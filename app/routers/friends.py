@@ -7,9 +7,11 @@ from typing import List, Optional
 import uuid
 
 from app.database import get_async_session
+from app.dependencies.read_session import get_read_session
 from app.models import User, Friend, PromoCode
-from app.dependencies.auth import get_current_user
+from app.dependencies.auth import get_current_user, Principal
 from app.services.rewards import reward_referrer  # <-- Import correct
+from app.services.bonus_service import invalidate_bonus_conditions
 
 router = APIRouter(prefix="/friends", tags=["Friends"])
 
@@ -29,7 +31,7 @@ class FriendResponse(BaseModel):
 # Générer son code promo
 # --------------------------
 @router.post("/generate-code")
-async def generate_code(current_user: User = Depends(get_current_user),
+async def generate_code(current_user: Principal = Depends(get_current_user),
                         db: AsyncSession = Depends(get_async_session)):
     user_id = current_user.id
 
@@ -57,7 +59,7 @@ async def generate_code(current_user: User = Depends(get_current_user),
 # --------------------------
 @router.post("/apply-code", response_model=FriendResponse)
 async def apply_code(payload: ApplyCodeRequest,
-                     current_user: User = Depends(get_current_user),
+                     current_user: Principal = Depends(get_current_user),
                      db: AsyncSession = Depends(get_async_session)):
     user_id = current_user.id
     code = payload.code.strip().upper()
@@ -101,6 +103,9 @@ async def apply_code(payload: ApplyCodeRequest,
         promo_result = await db.execute(select(PromoCode).where(PromoCode.user_id == user_id))
         promo_code = promo_result.scalar_one_or_none()
 
+    # 🔄 Nouvel ami accepté : conditions bonus à recalculer
+    invalidate_bonus_conditions(user_id)
+
     return {
         "promo_code": promo_code.code if promo_code else None,
         "friends": friends_list
@@ -110,8 +115,8 @@ async def apply_code(payload: ApplyCodeRequest,
 # Route GET /me
 # --------------------------
 @router.get("/me", response_model=FriendResponse)
-async def get_my_friends(current_user: User = Depends(get_current_user),
-                         db: AsyncSession = Depends(get_async_session)):
+async def get_my_friends(current_user: Principal = Depends(get_current_user),
+                         db: AsyncSession = Depends(get_read_session)):
     user_id = current_user.id
 
     friends_result = await db.execute(
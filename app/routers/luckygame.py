@@ -7,14 +7,13 @@ from pydantic import BaseModel
 
 from app.database import get_async_session
 from app.services import balance_service
-from app.routers.auth import get_current_user
-from app.models import User
+from app.dependencies.auth import get_current_user, Principal
+from app.services.game_store import lucky_games, LuckyGameState
+from app.services.credit_coalescer import credit_coalescer
+from app.services.progression import get_ladder
 
 router = APIRouter(prefix="/luckygame", tags=["LuckyGame"])
 
-# stockage temporaire des parties
-games = {}
-
 MAX_REWARD = 5_000_000
 
 
@@ -53,15 +52,7 @@ TIERS = {
 # ----------------------
 
 def map_level_to_tier(level: int) -> int:
-    if level <= 5:
-        return 1
-    if level <= 10:
-        return 2
-    if level <= 15:
-        return 3
-    if level <= 20:
-        return 4
-    return 5
+    return get_ladder("luckygame_tier").level_for(level)
 
 
 def generate_unique_multiplier(existing: List[float], min_v: float, max_v: float) -> float:
@@ -100,7 +91,7 @@ def generate_multipliers_for_tier(tier: int) -> List[float]:
 @router.post("/start")
 async def start_game(
     req: StartGameRequest,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     db: AsyncSession = Depends(get_async_session)
 ):
 
@@ -118,21 +109,20 @@ async def start_game(
 
     game_id = str(time.time_ns())
 
-    games[game_id] = {
-        "user_id": current_user.id,
-        "current_level": 1,
-        "current_reward": float(req.bet),
-        "active": True,
-        "multipliers": generate_multipliers_for_tier(1)
-    }
-
-    game = games[game_id]
+    game = LuckyGameState(
+        user_id=current_user.id,
+        current_level=1,
+        current_reward=float(req.bet),
+        active=True,
+        multipliers=generate_multipliers_for_tier(1)
+    )
+    await lucky_games.save(game_id, game)
 
     return {
         "game_id": game_id,
-        "level": game["current_level"],
-        "reward": int(game["current_reward"]),
-        "multipliers": game["multipliers"]
+        "level": game.current_level,
+        "reward": int(game.current_reward),
+        "multipliers": game.multipliers
     }
 
 
@@ -143,54 +133,60 @@ async def start_game(
 @router.post("/play")
 async def play_level(
     req: PlayRequest,
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
 
-    game = games.get(req.game_id)
+    game = await lucky_games.get(req.game_id)
 
     if not game:
         raise HTTPException(400, "Partie introuvable")
 
-    if not game["active"]:
+    if not game.active:
         raise HTTPException(400, "Partie terminée")
 
-    if game["user_id"] != current_user.id:
+    if game.user_id != current_user.id:
         raise HTTPException(403, "Accès refusé")
 
     if req.choice_index not in [0, 1, 2, 3]:
         raise HTTPException(400, "Choix invalide")
 
-    multipliers = game["multipliers"]
+    multipliers = game.multipliers
 
     chosen = float(multipliers[req.choice_index])
 
     # perdant
     if chosen == 0.0:
 
-        game["active"] = False
-        game["current_reward"] = 0
+        game.active = False
+        game.current_reward = 0
+
+        if not await lucky_games.save(req.game_id, game):
+            raise HTTPException(409, "Partie modifiée en parallèle")
 
         return {
             "result": "lose",
             "multipliers": multipliers,
             "reward": 0,
-            "level": game["current_level"]
+            "level": game.current_level
         }
 
     # gagnant
-    reward = game["current_reward"] * chosen
+    reward = game.current_reward * chosen
 
     if reward > MAX_REWARD:
         reward = float(MAX_REWARD)
 
-    game["current_reward"] = reward
-    game["current_level"] += 1
+    game.current_reward = reward
+    game.current_level += 1
 
-    tier = map_level_to_tier(game["current_level"])
+    tier = map_level_to_tier(game.current_level)
 
     next_multipliers = generate_multipliers_for_tier(tier)
 
-    game["multipliers"] = next_multipliers
+    game.multipliers = next_multipliers
+
+    if not await lucky_games.save(req.game_id, game):
+        raise HTTPException(409, "Partie modifiée en parallèle")
 
     return {
         "result": "continue",
@@ -198,7 +194,7 @@ async def play_level(
         "multipliers": multipliers,
         "next_multipliers": next_multipliers,
         "reward": int(reward),
-        "level": game["current_level"]
+        "level": game.current_level
     }
 
 
@@ -209,25 +205,26 @@ async def play_level(
 @router.post("/cashout")
 async def cashout(
     req: CashoutRequest,
-    current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_async_session)
+    current_user: Principal = Depends(get_current_user)
 ):
 
-    game = games.get(req.game_id)
+    game = await lucky_games.get(req.game_id)
 
     if not game:
         raise HTTPException(400, "Partie introuvable")
 
-    if not game["active"]:
+    if not game.active:
         raise HTTPException(400, "Partie déjà terminée")
 
-    if game["user_id"] != current_user.id:
+    if game.user_id != current_user.id:
         raise HTTPException(403, "Accès refusé")
 
-    # bloquer immédiatement la partie
-    game["active"] = False
+    # bloquer immédiatement la partie (save conditionnel : un seul cashout gagne)
+    game.active = False
+    if not await lucky_games.save(req.game_id, game):
+        raise HTTPException(400, "Partie déjà terminée")
 
-    reward = int(game["current_reward"])
+    reward = int(game.current_reward)
 
     if reward <= 0:
         raise HTTPException(400, "Récompense invalide")
@@ -235,10 +232,8 @@ async def cashout(
     if reward > MAX_REWARD:
         reward = MAX_REWARD
 
-    # crédit
-    await balance_service.credit_balance(db, current_user.id, reward)
-
-    await db.commit()
+    # crédit (regroupé avec les autres cashouts, commité avant la réponse)
+    await credit_coalescer.credit(current_user.id, reward, "luckygame_cashout", reference=req.game_id)
 
     return {
         "reward": reward,
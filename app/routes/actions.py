@@ -1,15 +1,18 @@
 from typing import List
 from datetime import datetime, timedelta
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 
 from app.database import get_async_session
-from app.models import Action, UserPack, User, DailyTask, UserDailyTask
-from app.schemas import ActionBase, ActionSchema, UserPackSchema
-from app.dependencies.auth import get_current_user
+from app.dependencies.read_session import get_read_session
+from app.models import Action, UserPack, DailyTask, UserDailyTask
+from app.schemas import ActionBase, ActionSchema, UserPackSchema, ActionCategoryEnum
+from app.dependencies.auth import get_current_user, Principal
 from app.services.cash_service import debit_real_cash
 from app.services.pack_service import start_pack, claim_pack_reward
+from app.services.bonus_service import invalidate_bonus_conditions
+from app.services.catalog_cache import action_catalog, catalog_response
 
 router = APIRouter(prefix="/actions", tags=["Actions"])
 
@@ -20,7 +23,7 @@ router = APIRouter(prefix="/actions", tags=["Actions"])
 async def create_action(
     payload: ActionBase,
     db: AsyncSession = Depends(get_async_session),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     new_action = Action(
         name=payload.name,
@@ -34,6 +37,7 @@ async def create_action(
     db.add(new_action)
     await db.commit()
     await db.refresh(new_action)
+    action_catalog.invalidate()
     return new_action
 
 
@@ -41,18 +45,21 @@ async def create_action(
 # 📋 Lister toutes les actions (packs)
 # -----------------------
 @router.get("/", response_model=List[ActionSchema])
-async def list_actions(db: AsyncSession = Depends(get_async_session)):
-    result = await db.execute(select(Action))
-    return result.scalars().all()
+async def list_actions(request: Request, db: AsyncSession = Depends(get_read_session)):
+    catalog = await action_catalog.get(db)
+    return catalog_response(request, catalog.body())
 
 
 # -----------------------
 # 🔍 Lister les actions par catégorie
 # -----------------------
 @router.get("/category/{category}", response_model=List[ActionSchema])
-async def list_actions_by_category(category: str, db: AsyncSession = Depends(get_async_session)):
-    result = await db.execute(select(Action).where(Action.category == category))
-    return result.scalars().all()
+async def list_actions_by_category(
+    category: ActionCategoryEnum, request: Request, db: AsyncSession = Depends(get_read_session)
+):
+    # catégorie validée (422 sinon) : le cache des corps par filtre reste borné
+    catalog = await action_catalog.get(db)
+    return catalog_response(request, catalog.body("category", category.value))
 
 
 # -----------------------
@@ -62,7 +69,7 @@ async def list_actions_by_category(category: str, db: AsyncSession = Depends(get
 async def buy_pack(
     action_id: int,
     db: AsyncSession = Depends(get_async_session),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     result = await db.execute(select(Action).where(Action.id == action_id))
     pack = result.scalars().first()
@@ -95,6 +102,7 @@ async def buy_pack(
     )
     db.add(user_pack)
     await db.commit()
+    invalidate_bonus_conditions(current_user.id)
     await db.refresh(user_pack)
     return user_pack
 
@@ -104,7 +112,7 @@ async def buy_pack(
 # -----------------------
 @router.get("/my-packs", response_model=List[UserPackSchema])
 async def get_my_packs(
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     db: AsyncSession = Depends(get_async_session)
 ):
     result = await db.execute(
@@ -136,7 +144,7 @@ async def get_my_packs(
 async def start_user_pack(
     user_pack_id: int,
     db: AsyncSession = Depends(get_async_session),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     return await start_pack(current_user.id, user_pack_id, db)
 
@@ -148,7 +156,7 @@ async def start_user_pack(
 async def get_user_pack_daily_tasks(
     user_pack_id: int,
     db: AsyncSession = Depends(get_async_session),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     # 1️⃣ Vérifie le pack
     result = await db.execute(
@@ -227,7 +235,7 @@ async def get_user_pack_daily_tasks(
 @router.post("/packs/daily-tasks/{task_id}/start")
 async def start_task(
     task_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     db: AsyncSession = Depends(get_async_session),
 ):
     result = await db.execute(
@@ -253,7 +261,7 @@ async def start_task(
 async def complete_task(
     task_id: int,
     db: AsyncSession = Depends(get_async_session),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     res = await db.execute(
         select(UserDailyTask).where(
@@ -295,7 +303,7 @@ async def complete_task(
 async def claim_reward(
     user_pack_id: int,
     db: AsyncSession = Depends(get_async_session),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
 ):
     """
     Permet à l'utilisateur de réclamer les gains d'un pack
@@ -3,8 +3,7 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.database import get_async_session
 from app.services.balance_service import credit_balance, get_user_balance
-from app.routers.auth import get_current_user
-from app.models import User
+from app.dependencies.auth import get_current_user, Principal
 
 router = APIRouter(
     prefix="/balance",
@@ -14,7 +13,7 @@ router = APIRouter(
 @router.post("/add")
 async def add_balance_points(
     points: int,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     db: AsyncSession = Depends(get_async_session)
 ):
     """
@@ -34,7 +33,7 @@ async def add_balance_points(
 
 @router.get("/")
 async def get_balance(
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     db: AsyncSession = Depends(get_async_session)
 ):
     """Retourne le total de points pour l’utilisateur connecté."""
@@ -2,24 +2,21 @@
 
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
+from sqlalchemy import select
 from datetime import datetime, timedelta
 from typing import List, Dict
 from decimal import Decimal
 
 from app.database import get_async_session
+from app.dependencies.read_session import get_read_session
 from app.models import (
     Bonus,
-    RealCash,
-    Friend,
-    UserPack,
-    Action,
-    ActionCategory,
-    UserAction,
     User,
 )
 from app.schemas import BonusOut
 from app.services.wallet_service import credit_wallet
+from app.services.bonus_service import fetch_bonus_conditions
+from app.services.ledger_journal import ACCOUNT_BONUS, record_entry
 
 router = APIRouter(prefix="/bonus", tags=["Bonus"])
 
@@ -30,47 +27,18 @@ COOLDOWN_HOURS = 24
 # ============================================================
 # 🔹 VERIFICATION CONDITIONS
 # ============================================================
-async def check_bonus_conditions(user_id: int, db: AsyncSession):
+async def check_bonus_conditions(user_id: int, db: AsyncSession, use_cache: bool = True):
 
-    # 1️⃣ PACK
-    has_pack = (
-        await db.execute(
-            select(UserPack).where(UserPack.user_id == user_id)
-        )
-    ).scalars().first() is not None
-
-    if not has_pack:
-        has_pack = (
-            await db.execute(
-                select(UserAction)
-                .join(Action)
-                .where(
-                    UserAction.user_id == user_id,
-                    Action.category == ActionCategory.finance,
-                )
-            )
-        ).scalars().first() is not None
+    facts = await fetch_bonus_conditions(db, user_id, use_cache=use_cache)
 
-    # 2️⃣ DEPOT
-    real_cash = (
-        await db.execute(
-            select(RealCash).where(RealCash.user_id == user_id)
-        )
-    ).scalars().first()
+    # 1️⃣ PACK (pack acheté ou action finance)
+    has_pack = facts["has_user_pack"] or facts["has_finance_action"]
 
-    has_deposit = bool(real_cash and real_cash.cash_balance > 0)
+    # 2️⃣ DEPOT
+    has_deposit = facts["has_cash_deposit"]
 
     # 3️⃣ FRIENDS
-    friends_count = (
-        await db.execute(
-            select(func.count())
-            .select_from(Friend)
-            .where(
-                Friend.user_id == user_id,
-                Friend.status == "accepted",
-            )
-        )
-    ).scalar() or 0
+    friends_count = facts["friends_count"]
 
     return {
         "has_pack": has_pack,
@@ -84,7 +52,7 @@ async def check_bonus_conditions(user_id: int, db: AsyncSession):
 # 🔹 LISTE BONUS USER
 # ============================================================
 @router.get("/{user_id}", response_model=List[BonusOut])
-async def get_user_bonus(user_id: int, db: AsyncSession = Depends(get_async_session)):
+async def get_user_bonus(user_id: int, db: AsyncSession = Depends(get_read_session)):
 
     result = await db.execute(
         select(Bonus).where(Bonus.user_id == user_id)
@@ -161,7 +129,8 @@ async def claim_bonus(user_id: int, db: AsyncSession = Depends(get_async_session
     if not bonus:
         raise HTTPException(status_code=404, detail="Bonus introuvable")
 
-    conditions = await check_bonus_conditions(user_id, db)
+    # 🔒 claim = mouvement d'argent : jamais depuis le cache
+    conditions = await check_bonus_conditions(user_id, db, use_cache=False)
 
     if not conditions["all_conditions_met"]:
         raise HTTPException(status_code=400, detail="Conditions non remplies")
@@ -191,6 +160,7 @@ async def claim_bonus(user_id: int, db: AsyncSession = Depends(get_async_session
     # 🔹 UPDATE BONUS
     bonus.points_restants -= CLAIM_AMOUNT
     bonus.last_claim_at = datetime.utcnow()
+    record_entry(db, ACCOUNT_BONUS, user_id, -CLAIM_AMOUNT, "bonus_claim", reference=str(bonus.id))
 
     if bonus.points_restants <= Decimal("0"):
         bonus.status = "converti"
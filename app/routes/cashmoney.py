@@ -3,8 +3,8 @@ from sqlalchemy.future import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database import AsyncSessionLocal
-from app.models import RealCash, User
-from app.routers.auth import get_current_user
+from app.models import RealCash
+from app.dependencies.auth import get_current_user, Principal
 
 
 router = APIRouter(
@@ -15,7 +15,7 @@ router = APIRouter(
 
 @router.get("/realcash")
 async def get_real_cash(
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     """
     Retourne le solde d'argent réel de l'utilisateur connecté.
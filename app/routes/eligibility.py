@@ -5,24 +5,23 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func, distinct
 from datetime import datetime
 
-from app.database import get_async_session
+from app.dependencies.read_session import get_read_session
 from app.models import (
-    User,
     Friend,
     UserPack,
     UserTask,
     Balance,
     UserMiningStats,  # ✅ AJOUT
 )
-from app.dependencies.auth import get_current_user
+from app.dependencies.auth import get_current_user, Principal
 
 router = APIRouter(prefix="/eligibility", tags=["Airdrop"])
 
 
 @router.get("/check")
 async def check_eligibility(
-    current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_async_session),
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_session),
 ):
     user_id = current_user.id
 
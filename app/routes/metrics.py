@@ -0,0 +1,40 @@
+# app/routes/metrics.py
+import os
+from typing import Optional
+
+from fastapi import APIRouter, Header, HTTPException, status
+from fastapi.responses import PlainTextResponse
+
+from app.utils.metrics import REGISTRY
+from app.utils.sql_stats import pool_stats
+
+router = APIRouter(tags=["Monitoring"])
+
+# 🔐 Optionnel : si défini, /metrics exige "Authorization: Bearer <token>"
+METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+
+
+# ===============================
+# 📈 Export Prometheus (métriques du worker courant)
+# ===============================
+def _check_token(authorization: Optional[str]):
+    if METRICS_TOKEN and authorization != f"Bearer {METRICS_TOKEN}":
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Non autorisé")
+
+
+@router.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def metrics(authorization: Optional[str] = Header(default=None)):
+    _check_token(authorization)
+    return PlainTextResponse(
+        REGISTRY.render(),
+        media_type="text/plain; version=0.0.4; charset=utf-8",
+    )
+
+
+# ===============================
+# 🔌 Télémétrie du pool de connexions (JSON)
+# ===============================
+@router.get("/metrics/pool", include_in_schema=False)
+async def metrics_pool(authorization: Optional[str] = Header(default=None)):
+    _check_token(authorization)
+    return pool_stats()
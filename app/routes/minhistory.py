@@ -6,27 +6,20 @@ from sqlalchemy import select, func, delete
 from datetime import datetime
 
 from app.database import get_async_session
-from app.models import MiningHistory, Balance, UserMiningStats
+from app.dependencies.read_session import get_read_session
+from app.models import MiningHistory, Balance, UserMiningStats, MiningDailyRollup
 from app.schemas import AddMiningPayload, MiningStatusResponse, AddMiningResponse
+from app.services.balance_service import credit_balance
+from app.services.ledger import upsert_mining_stats, upsert_mining_rollup
+from app.services.progression import get_ladder
+from app.services.ledger_journal import ACCOUNT_BALANCE, record_entry
 
 router = APIRouter(prefix="/minhistory", tags=["MiningHistory"])
 
-# ⚡ Paliers de niveau (doivent rester cohérents frontend/backend)
-LEVEL_THRESHOLDS = [0, 5000, 14000, 32000, 65000, 100000, 160000, 230000, 310000]
-
-
-# ---------- Helpers ----------
-def compute_level(total_points: int) -> int:
-    level = 1
-    for i, threshold in enumerate(LEVEL_THRESHOLDS, start=1):
-        if total_points >= threshold:
-            level = i
-    return level
-
 
 # ---------- Endpoints ----------
 @router.get("/user/{user_id}", response_model=MiningStatusResponse)
-async def get_user_mining_status(user_id: int, session: AsyncSession = Depends(get_async_session)):
+async def get_user_mining_status(user_id: int, session: AsyncSession = Depends(get_read_session)):
     """
     Retourne le total des points minés et le niveau de l'utilisateur.
     """
@@ -35,17 +28,19 @@ async def get_user_mining_status(user_id: int, session: AsyncSession = Depends(g
     )
     stats = result.scalar_one_or_none()
 
+    ladder = get_ladder("mining")
+
     if not stats:
         return {
             "user_id": user_id,
             "total_points": 0,
-            "level": 1
+            **ladder.progress(0)
         }
 
     return {
         "user_id": user_id,
         "total_points": int(stats.total_mined),
-        "level": stats.level
+        **ladder.progress(int(stats.total_mined))
     }
 
 
@@ -77,54 +72,32 @@ async def add_mining_entry(payload: AddMiningPayload, session: AsyncSession = De
     # -------------------------
     # 2️⃣ Mettre à jour Balance
     # -------------------------
-    result = await session.execute(
-        select(Balance).where(Balance.user_id == user_id)
-    )
-    balance_row = result.scalar_one_or_none()
-
-    if balance_row is None:
-        balance_row = Balance(user_id=user_id, points=points)
-        session.add(balance_row)
-    else:
-        balance_row.points = (balance_row.points or 0) + points
+    new_balance = await credit_balance(session, user_id, points)
 
     # -------------------------
     # 3️⃣ Mettre à jour UserMiningStats
     # -------------------------
-    result_stats = await session.execute(
-        select(UserMiningStats).where(UserMiningStats.user_id == user_id)
+    total_mined, level = await upsert_mining_stats(
+        session, user_id, points, get_ladder("mining")
     )
-    stats = result_stats.scalar_one_or_none()
-
-    if stats is None:
-        total_mined = points
-        level = compute_level(total_mined)
-
-        stats = UserMiningStats(
-            user_id=user_id,
-            total_mined=total_mined,
-            level=level
-        )
-        session.add(stats)
 
-    else:
-        stats.total_mined += points
-        stats.level = compute_level(stats.total_mined)
+    # -------------------------
+    # 4️⃣ Cumul journalier
+    # -------------------------
+    await upsert_mining_rollup(session, user_id, now.date(), history.source, points)
 
     # -------------------------
     # Commit
     # -------------------------
     await session.commit()
     await session.refresh(history)
-    await session.refresh(balance_row)
-    await session.refresh(stats)
 
     return {
         "user_id": user_id,
         "added": points,
-        "new_balance": int(balance_row.points),
-        "total_mined": int(stats.total_mined),
-        "level": stats.level,
+        "new_balance": int(new_balance),
+        "total_mined": int(total_mined),
+        "level": level,
         "history_id": int(history.id)
     }
 
@@ -141,6 +114,11 @@ async def reset_user_mining(user_id: int, session: AsyncSession = Depends(get_as
         delete(MiningHistory).where(MiningHistory.user_id == user_id)
     )
 
+    # Supprimer les cumuls journaliers
+    await session.execute(
+        delete(MiningDailyRollup).where(MiningDailyRollup.user_id == user_id)
+    )
+
     # Réinitialiser Balance
     result = await session.execute(
         select(Balance).where(Balance.user_id == user_id)
@@ -148,6 +126,9 @@ async def reset_user_mining(user_id: int, session: AsyncSession = Depends(get_as
     balance_row = result.scalar_one_or_none()
 
     if balance_row:
+        # 🧾 écriture compensatoire : le journal reste égal à Balance.points
+        if balance_row.points:
+            record_entry(session, ACCOUNT_BALANCE, user_id, -balance_row.points, "mining_reset")
         balance_row.points = 0
         session.add(balance_row)
 
@@ -1,13 +1,24 @@
 # app/routes/mining.py
 
-from fastapi import APIRouter, Depends, HTTPException
+import asyncio
+import base64
+import json
+import os
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from datetime import datetime, timedelta
+from sqlalchemy import select, func, tuple_
+from datetime import date, datetime, timedelta
 
-from app.database import get_async_session
-from app.models import User, MiningHistory, MineTimer, UserMiningStats
+from app.database import get_async_session, AsyncSessionLocal
+from app.dependencies.read_session import get_read_session
+from app.models import User, MiningHistory, MineTimer, UserMiningStats, MiningDailyRollup
 from app.services.balance_service import credit_balance
+from app.services.ledger import upsert_mining_stats, upsert_mining_rollup
+from app.services.mining_events import mining_status_hub, render_status
+from app.services.progression import get_ladder
 
 router = APIRouter(tags=["Mining"])
 
@@ -15,28 +26,11 @@ router = APIRouter(tags=["Mining"])
 COOLDOWN_HOURS = 24
 POINTS_PER_CYCLE = 200
 
-# 🎯 Level thresholds (progressif)
-LEVEL_THRESHOLDS = [
-    0,
-    1000,
-    3000,
-    6000,
-    10000,
-    15000,
-    25000,
-    40000,
-    60000
-]
-
-
-def calculate_level(total_mined: int) -> int:
-    level = 1
-    for i, threshold in enumerate(LEVEL_THRESHOLDS, start=1):
-        if total_mined >= threshold:
-            level = i
-        else:
-            break
-    return level
+# 💓 Commentaire SSE pour garder la connexion ouverte (proxies)
+MINING_SSE_KEEPALIVE_SECONDS = float(os.getenv("MINING_SSE_KEEPALIVE_SECONDS", 15))
+
+# 📦 Lignes lues par lot pendant l'export NDJSON
+HISTORY_EXPORT_CHUNK = int(os.getenv("HISTORY_EXPORT_CHUNK", 1000))
 
 
 # -----------------------------
@@ -83,6 +77,10 @@ async def start_mining(user_id: int, session: AsyncSession = Depends(get_async_s
     await session.commit()
     await session.refresh(new_timer)
 
+    # 📡 transition poussée aux flux SSE ouverts (aucune requête sinon)
+    if mining_status_hub.is_watched(user_id):
+        mining_status_hub.publish(user_id, await load_mining_state(session, user_id))
+
     return {
         "status": "authorized",
         "mining_timer_id": new_timer.id,
@@ -94,51 +92,91 @@ async def start_mining(user_id: int, session: AsyncSession = Depends(get_async_s
 # -----------------------------
 # Statut du minage
 # -----------------------------
-@router.get("/status/{user_id}")
-async def mining_status(user_id: int, session: AsyncSession = Depends(get_async_session)):
-
+async def load_mining_state(session: AsyncSession, user_id: int) -> dict:
     now = datetime.utcnow()
 
     result_timer = await session.execute(
-        select(MineTimer).where(
+        select(MineTimer.end_time).where(
             MineTimer.user_id == user_id,
             MineTimer.claimed == False
         )
     )
-    active_timer = result_timer.scalar_one_or_none()
+    end_time = result_timer.scalar_one_or_none()
 
     # 🔥 récupérer les stats
     result_stats = await session.execute(
-        select(UserMiningStats).where(UserMiningStats.user_id == user_id)
+        select(UserMiningStats.level, UserMiningStats.total_mined)
+        .where(UserMiningStats.user_id == user_id)
     )
-    stats = result_stats.scalar_one_or_none()
+    stats = result_stats.first()
 
-    level = stats.level if stats else 1
-    total_mined = stats.total_mined if stats else 0
+    if end_time is None:
+        status = "idle"
+    elif end_time > now:
+        status = "running"
+    else:
+        status = "ready_to_claim"
 
-    if not active_timer:
-        return {
-            "status": "idle",
-            "level": level,
-            "total_mined": total_mined
-        }
+    return {
+        "status": status,
+        "end_time": end_time,
+        "total_cycle_ms": COOLDOWN_HOURS * 3600 * 1000,
+        "level": stats.level if stats else 1,
+        "total_mined": stats.total_mined if stats else 0,
+    }
 
-    if active_timer.end_time > now:
-        remaining = active_timer.end_time - now
 
-        return {
-            "status": "running",
-            "remaining_time_ms": int(remaining.total_seconds() * 1000),
-            "total_cycle_ms": COOLDOWN_HOURS * 3600 * 1000,
-            "level": level,
-            "total_mined": total_mined
-        }
+@router.get("/status/{user_id}")
+async def mining_status(user_id: int, session: AsyncSession = Depends(get_read_session)):
 
-    return {
-        "status": "ready_to_claim",
-        "level": level,
-        "total_mined": total_mined
-    }
+    state = await load_mining_state(session, user_id)
+    payload = render_status(state)
+
+    # réponse historique (sans expires_at)
+    payload.pop("expires_at", None)
+    return payload
+
+
+# -----------------------------
+# Statut du minage (SSE)
+# -----------------------------
+@router.get("/status/{user_id}/stream")
+async def mining_status_stream(
+    user_id: int,
+    request: Request,
+    session: AsyncSession = Depends(get_async_session)
+):
+    """
+    Envoie l'état une fois, puis uniquement les transitions
+    (running → ready_to_claim → claimed). Aucune requête SQL ensuite.
+    """
+    state = await load_mining_state(session, user_id)
+
+    # libère la connexion : le flux peut durer des heures
+    await session.close()
+
+    queue = mining_status_hub.subscribe(user_id, state)
+
+    async def event_stream():
+        try:
+            while True:
+                try:
+                    state = await asyncio.wait_for(queue.get(), timeout=MINING_SSE_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        break
+                    yield ": keepalive\n\n"
+                    continue
+
+                yield f"event: status\ndata: {json.dumps(render_status(state))}\n\n"
+        finally:
+            mining_status_hub.unsubscribe(user_id, queue)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 # -----------------------------
@@ -190,24 +228,13 @@ async def claim_mining(user_id: int, session: AsyncSession = Depends(get_async_s
     # -------------------------
     # Mining stats
     # -------------------------
-    result_stats = await session.execute(
-        select(UserMiningStats).where(UserMiningStats.user_id == user_id)
+    # ✅ total + level (progressif) en une seule requête
+    total_mined, level = await upsert_mining_stats(
+        session, user_id, points_earned, get_ladder("mining")
     )
-    stats = result_stats.scalar_one_or_none()
 
-    if not stats:
-        stats = UserMiningStats(
-            user_id=user_id,
-            total_mined=0,
-            level=1
-        )
-        session.add(stats)
-        await session.flush()
-
-    stats.total_mined += points_earned
-
-    # ✅ Nouveau calcul level (progressif)
-    stats.level = calculate_level(stats.total_mined)
+    # 📊 cumul journalier (graphiques / airdrop)
+    await upsert_mining_rollup(session, user_id, now.date(), new_entry.source, points_earned)
 
     # -------------------------
     # Finalisation
@@ -217,44 +244,190 @@ async def claim_mining(user_id: int, session: AsyncSession = Depends(get_async_s
     await session.commit()
     await session.refresh(new_entry)
 
+    mining_status_hub.publish(user_id, {
+        "status": "claimed",
+        "end_time": None,
+        "total_cycle_ms": COOLDOWN_HOURS * 3600 * 1000,
+        "level": level,
+        "total_mined": total_mined,
+    })
+
     return {
         "status": "success",
         "points_earned": points_earned,
         "new_balance": new_balance,
-        "total_mined": stats.total_mined,
-        "level": stats.level
+        "total_mined": total_mined,
+        "level": level,
+        "next_level_at": get_ladder("mining").next_threshold(level)
     }
 
 
 # -----------------------------
-# Historique
+# Historique (pagination par curseur)
 # -----------------------------
-@router.get("/history/{user_id}")
-async def get_mining_history(user_id: int, session: AsyncSession = Depends(get_async_session)):
+HISTORY_DEFAULT_LIMIT = 50
+HISTORY_MAX_LIMIT = 500
 
-    result = await session.execute(select(User).where(User.id == user_id))
-    user = result.scalar_one_or_none()
+HISTORY_COLUMNS = (
+    MiningHistory.id,
+    MiningHistory.points,
+    MiningHistory.source,
+    MiningHistory.created_at,
+)
 
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
 
-    result_hist = await session.execute(
-        select(MiningHistory)
+def encode_cursor(created_at: datetime, entry_id: int) -> str:
+    raw = f"{created_at.isoformat()}|{entry_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        created_at, entry_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(created_at), int(entry_id)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def history_query(user_id: int, since: Optional[datetime], until: Optional[datetime]):
+    # colonnes seules (pas d'objets ORM), ordre de l'index (user_id, created_at DESC, id DESC)
+    stmt = (
+        select(*HISTORY_COLUMNS)
         .where(MiningHistory.user_id == user_id)
-        .order_by(MiningHistory.created_at.desc())
+        .order_by(MiningHistory.created_at.desc(), MiningHistory.id.desc())
     )
+    if since is not None:
+        stmt = stmt.where(MiningHistory.created_at >= since)
+    if until is not None:
+        stmt = stmt.where(MiningHistory.created_at < until)
+    return stmt
+
+
+def serialize_history_row(row) -> dict:
+    return {
+        "id": row.id,
+        "points": row.points,
+        "source": row.source,
+        "created_at": row.created_at.isoformat() if row.created_at else None
+    }
+
+
+@router.get("/history/{user_id}")
+async def get_mining_history(
+    user_id: int,
+    limit: int = Query(HISTORY_DEFAULT_LIMIT, ge=1, le=HISTORY_MAX_LIMIT),
+    cursor: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    session: AsyncSession = Depends(get_read_session)
+):
+
+    stmt = history_query(user_id, since, until)
+
+    if cursor:
+        cursor_created_at, cursor_id = decode_cursor(cursor)
+        stmt = stmt.where(
+            tuple_(MiningHistory.created_at, MiningHistory.id) < tuple_(cursor_created_at, cursor_id)
+        )
+
+    # une ligne de plus pour savoir s'il reste une page
+    rows = (await session.execute(stmt.limit(limit + 1))).all()
 
-    history = result_hist.scalars().all()
+    # existence de l'utilisateur vérifiée seulement si la première page est vide
+    if not rows and not cursor:
+        exists = (await session.execute(select(User.id).where(User.id == user_id))).first()
+        if not exists:
+            raise HTTPException(status_code=404, detail="User not found")
+
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    next_cursor = None
+    if has_more:
+        last = rows[-1]
+        next_cursor = encode_cursor(last.created_at, last.id)
+
+    return {
+        "user_id": user_id,
+        "history": [serialize_history_row(row) for row in rows],
+        "next_cursor": next_cursor
+    }
+
+
+# -----------------------------
+# Totaux journaliers (rollup)
+# -----------------------------
+@router.get("/history/{user_id}/daily")
+async def get_mining_daily(
+    user_id: int,
+    since: Optional[date] = None,
+    until: Optional[date] = None,
+    source: Optional[str] = None,
+    by_source: bool = False,
+    session: AsyncSession = Depends(get_read_session)
+):
+    """Points minés par jour (UTC), lus dans mining_daily_rollup : une ligne par jour."""
+
+    if by_source:
+        stmt = select(
+            MiningDailyRollup.day,
+            MiningDailyRollup.source,
+            MiningDailyRollup.total_points,
+            MiningDailyRollup.entries,
+        ).order_by(MiningDailyRollup.day, MiningDailyRollup.source)
+    else:
+        stmt = select(
+            MiningDailyRollup.day,
+            func.sum(MiningDailyRollup.total_points).label("total_points"),
+            func.sum(MiningDailyRollup.entries).label("entries"),
+        ).group_by(MiningDailyRollup.day).order_by(MiningDailyRollup.day)
+
+    stmt = stmt.where(MiningDailyRollup.user_id == user_id)
+    if since is not None:
+        stmt = stmt.where(MiningDailyRollup.day >= since)
+    if until is not None:
+        stmt = stmt.where(MiningDailyRollup.day <= until)
+    if source is not None:
+        stmt = stmt.where(MiningDailyRollup.source == source)
+
+    rows = (await session.execute(stmt)).all()
+
+    days = []
+    for row in rows:
+        item = {
+            "day": row.day.isoformat(),
+            "total_points": int(row.total_points),
+            "entries": int(row.entries),
+        }
+        if by_source:
+            item["source"] = row.source
+        days.append(item)
 
     return {
         "user_id": user_id,
-        "history": [
-            {
-                "id": h.id,
-                "points": h.points,
-                "source": h.source,
-                "created_at": h.created_at.isoformat() if h.created_at else None
-            }
-            for h in history
-        ]
-    }
\ No newline at end of file
+        "days": days
+    }
+
+
+# -----------------------------
+# Export NDJSON (streaming)
+# -----------------------------
+@router.get("/history/{user_id}/export")
+async def export_mining_history(
+    user_id: int,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None
+):
+
+    stmt = history_query(user_id, since, until).execution_options(yield_per=HISTORY_EXPORT_CHUNK)
+
+    async def ndjson_lines():
+        # session propre au flux : celle de la requête est fermée avant l'envoi
+        async with AsyncSessionLocal() as stream_session:
+            result = await stream_session.stream(stmt)
+            async for partition in result.partitions():
+                yield "".join(
+                    json.dumps(serialize_history_row(row)) + "\n" for row in partition
+                )
+
+    return StreamingResponse(ndjson_lines(), media_type="application/x-ndjson")
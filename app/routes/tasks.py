@@ -1,5 +1,5 @@
 # app/routes/tasks.py
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from typing import List
@@ -7,12 +7,14 @@ from pydantic import BaseModel
 from datetime import datetime
 
 from app.database import get_async_session
-from app.models import Task, UserTask, User
+from app.dependencies.read_session import get_read_session
+from app.models import Task, UserTask
 from app.schemas import TaskSchema
 from decimal import Decimal
-from app.dependencies.auth import get_current_user
+from app.dependencies.auth import get_current_user, Principal
 from app.services.balance_service import credit_balance
 from app.services.bonus_service import add_bonus_points # ✅ remplace add_wallet_points
+from app.services.catalog_cache import task_catalog, catalog_response
 
 router = APIRouter(
     tags=["Tasks"]  # ✅ aucun prefix ici
@@ -31,9 +33,9 @@ class ValidateTaskRequest(BaseModel):
 # 1. Liste de toutes les tâches disponibles
 # ------------------------
 @router.get("/", response_model=List[TaskSchema])
-async def get_all_tasks(db: AsyncSession = Depends(get_async_session)):
-    result = await db.execute(select(Task))
-    return result.scalars().all()
+async def get_all_tasks(request: Request, db: AsyncSession = Depends(get_read_session)):
+    catalog = await task_catalog.get(db)
+    return catalog_response(request, catalog.body())
 
 # ------------------------
 # 2. Démarrage d’une tâche
@@ -42,7 +44,7 @@ async def get_all_tasks(db: AsyncSession = Depends(get_async_session)):
 async def start_task(
     task_id: int,
     db: AsyncSession = Depends(get_async_session),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     result = await db.execute(select(Task).where(Task.id == task_id))
     task = result.scalars().first()
@@ -84,7 +86,7 @@ async def validate_task(
     task_id: int,
     payload: ValidateTaskRequest,
     db: AsyncSession = Depends(get_async_session),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     result = await db.execute(select(Task).where(Task.id == task_id))
     task = result.scalars().first()
@@ -156,7 +158,7 @@ async def validate_task(
 @router.get("/me/completed-count")
 async def get_completed_tasks_count(
     db: AsyncSession = Depends(get_async_session),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     result = await db.execute(
         select(UserTask).where(
@@ -173,20 +175,21 @@ async def get_completed_tasks_count(
 @router.get("/me/pending")
 async def get_my_pending_tasks(
     db: AsyncSession = Depends(get_async_session),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
-    result = await db.execute(select(Task))
-    all_tasks = result.scalars().all()
+    all_tasks = (await task_catalog.get(db)).items
 
+    # Une seule requête pour toutes les UserTask de l'utilisateur
+    result = await db.execute(
+        select(UserTask.task_id, UserTask.started_at, UserTask.completed)
+        .where(UserTask.user_id == current_user.id)
+    )
+    user_tasks = {row.task_id: row for row in result}
+
+    now = datetime.utcnow()
     pending_tasks = []
     for task in all_tasks:
-        result = await db.execute(
-            select(UserTask).where(
-                UserTask.user_id == current_user.id,
-                UserTask.task_id == task.id
-            )
-        )
-        user_task = result.scalars().first()
+        user_task = user_tasks.get(task["id"])
 
         completed = False
         started_at = None
@@ -196,17 +199,17 @@ async def get_my_pending_tasks(
             completed = user_task.completed
             started_at = user_task.started_at
             if user_task.started_at and not user_task.completed:
-                elapsed = (datetime.utcnow() - user_task.started_at).total_seconds()
+                elapsed = (now - user_task.started_at).total_seconds()
                 time_left = max(0, TASK_MIN_DURATION - int(elapsed))
 
         if not completed:  # On exclut les tâches déjà validées
             pending_tasks.append({
-                "id": task.id,
-                "title": task.title,
-                "description": task.description,
-                "link": task.link,
-                "logo": task.logo,  # ✅ ajouté ici
-                "reward_points": task.reward_points,
+                "id": task["id"],
+                "title": task["title"],
+                "description": task["description"],
+                "link": task["link"],
+                "logo": task["logo"],  # ✅ ajouté ici
+                "reward_points": task["reward_points"],
                 "completed": completed,
                 "started_at": started_at.isoformat() if started_at else None,
                 "time_left": time_left
@@ -1,47 +1,55 @@
 import random
+import time
 import uuid
 import asyncio
+from typing import Optional
 from fastapi import APIRouter, Depends, WebSocket, WebSocketDisconnect, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database import get_async_session
-from app.models import User
-from app.routers.auth import get_current_user
+from app.dependencies.auth import get_current_user, Principal
 from app.services import balance_service
+from app.services.game_store import trade_games, TradeGameState, TradeBet
+from app.services.crash_curve import (
+    CRASH_CURVE_GROWTH,
+    CRASH_CHECKPOINT_SECONDS,
+    new_seed,
+    crash_point,
+    multiplier_at,
+    crash_elapsed,
+    elapsed_since,
+)
+from app.services.game_broadcast import BroadcastHub, END_OF_STREAM
+from app.services.credit_coalescer import credit_coalescer
 
 router = APIRouter(prefix="/tradegame", tags=["Trade Game"])
 
 logos = ["bitcoin", "pi", "toncoin", "blackcoin"]
 
-active_games = {}
-
 MAX_GAIN = 10_000_000
 
+progress_hub = BroadcastHub("tradegame")
+
 
 # -------------------------
 # Utils
 # -------------------------
 
-def generate_multiplier():
-    r = random.random()
-
-    if r < 0.8:
-        return round(random.uniform(1.0, 5.0), 2)
-
-    elif r < 0.9:
-        return round(random.uniform(5.0, 20.0), 2)
-
-    elif r < 0.97:
-        return round(random.uniform(20.0, 100.0), 2)
-
-    else:
-        return round(random.uniform(100.0, 500.0), 2)
-
-
 def choose_logo():
     return random.choice(logos)
 
 
+async def mark_finished(game_id: str):
+    # relit la partie : un cashout a pu la modifier pendant la progression
+    for _ in range(3):
+        game = await trade_games.get(game_id)
+        if not game or game.finished:
+            return
+        game.finished = True
+        if await trade_games.save(game_id, game):
+            return
+
+
 # -------------------------
 # Start game
 # -------------------------
@@ -51,7 +59,7 @@ async def play_round(
     bet1: int = 0,
     bet2: int = 0,
     db: AsyncSession = Depends(get_async_session),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
 
     if bet1 < 0 or bet2 < 0:
@@ -77,28 +85,26 @@ async def play_round(
 
     game_id = str(uuid.uuid4())
 
-    multiplier_max = generate_multiplier()
+    seed = new_seed()
     logo = choose_logo()
 
-    active_games[game_id] = {
-        "user_id": current_user.id,
-        "logo": logo,
-        "multiplier_max": multiplier_max,
-        "bets": {},
-        "finished": False
-    }
+    # la courbe démarre maintenant : le client se synchronise via le WebSocket
+    game = TradeGameState(
+        user_id=current_user.id,
+        logo=logo,
+        seed=seed,
+        multiplier_max=crash_point(seed),
+        started_at=time.time(),
+        bets={}
+    )
 
     if bet1 > 0:
-        active_games[game_id]["bets"]["bet1"] = {
-            "amount": bet1,
-            "cashed_out": False
-        }
+        game.bets["bet1"] = TradeBet(bet1)
 
     if bet2 > 0:
-        active_games[game_id]["bets"]["bet2"] = {
-            "amount": bet2,
-            "cashed_out": False
-        }
+        game.bets["bet2"] = TradeBet(bet2)
+
+    await trade_games.save(game_id, game)
 
     return {
         "game_id": game_id,
@@ -114,57 +120,69 @@ async def play_round(
 async def cashout(
     game_id: str,
     bet_key: str,
-    cashout_multiplier: float,
-    db: AsyncSession = Depends(get_async_session),
-    current_user: User = Depends(get_current_user)
+    cashout_multiplier: Optional[float] = None,
+    current_user: Principal = Depends(get_current_user)
 ):
 
-    game = active_games.get(game_id)
+    game = await trade_games.get(game_id)
 
     if not game:
         raise HTTPException(400, "Partie introuvable")
 
-    if game["user_id"] != current_user.id:
+    if game.user_id != current_user.id:
         raise HTTPException(403, "Accès refusé")
 
-    if game["finished"]:
+    if game.finished:
         raise HTTPException(400, "Partie terminée")
 
-    bet = game["bets"].get(bet_key)
+    bet = game.bets.get(bet_key)
 
     if not bet:
         raise HTTPException(400, "Mise invalide")
 
-    if bet["cashed_out"]:
+    if bet.cashed_out:
         raise HTTPException(400, "Déjà encaissé")
 
-    max_mult = game["multiplier_max"]
+    # multiplicateur calculé par le serveur ; celui du client n'est qu'un plafond
+    elapsed = elapsed_since(game.started_at)
+    multiplier = multiplier_at(elapsed)
 
-    if cashout_multiplier > max_mult:
+    if cashout_multiplier is not None:
+        if cashout_multiplier < 1.0:
+            raise HTTPException(400, "Multiplicateur invalide")
+        multiplier = min(multiplier, cashout_multiplier)
 
-        bet["cashed_out"] = True
-        bet["amount"] = 0
+    if elapsed >= crash_elapsed(game.multiplier_max):
+
+        bet.cashed_out = True
+        bet.amount = 0
+
+        if not await trade_games.save(game_id, game):
+            raise HTTPException(400, "Déjà encaissé")
 
         return {
             "message": "Crash",
             "gain": 0
         }
 
-    gain = int(bet["amount"] * cashout_multiplier)
+    gain = int(bet.amount * multiplier)
 
     if gain > MAX_GAIN:
         gain = MAX_GAIN
 
-    bet["cashed_out"] = True
+    bet.cashed_out = True
 
-    await balance_service.credit_balance(db, current_user.id, gain)
+    # save conditionnel : un seul cashout par mise, même entre workers
+    if not await trade_games.save(game_id, game):
+        raise HTTPException(400, "Déjà encaissé")
 
-    await db.commit()
+    # crédit (regroupé avec les autres cashouts, commité avant la réponse)
+    await credit_coalescer.credit(current_user.id, gain, "tradegame_cashout", reference=game_id)
 
     return {
         "message": "Cashout réussi",
         "bet": bet_key,
-        "multiplier": cashout_multiplier,
+        "multiplier": multiplier,
         "gain": gain
     }
 
@@ -173,58 +191,68 @@ async def cashout(
 # Websocket progress
 # -------------------------
 
+async def progress_frames(game_id: str, game: TradeGameState):
+    """Points de contrôle de la partie, jusqu'au crash (produits une seule fois par partie)."""
+    crash_at = game.started_at + crash_elapsed(game.multiplier_max)
+
+    while True:
+        remaining = crash_at - time.time()
+        if remaining <= 0:
+            break
+
+        await asyncio.sleep(min(CRASH_CHECKPOINT_SECONDS, remaining))
+
+        if time.time() < crash_at:
+            yield {"multiplier": multiplier_at(elapsed_since(game.started_at))}
+
+    await mark_finished(game_id)
+
+    yield {
+        "event": "crash",
+        "final_multiplier": game.multiplier_max
+    }
+
+
 @router.websocket("/ws/progress/{game_id}")
 async def game_progress(websocket: WebSocket, game_id: str):
 
     await websocket.accept()
 
-    game = active_games.get(game_id)
+    game = await trade_games.get(game_id)
 
     if not game:
         await websocket.send_json({"error": "Partie introuvable"})
         await websocket.close()
         return
 
-    multiplier_max = game["multiplier_max"]
+    # une boucle par partie, partagée par tous les spectateurs
+    channel, sub = progress_hub.join(game_id, lambda: progress_frames(game_id, game))
 
     try:
 
-        current = 1.0
-        base_step = 0.05
-
-        while current < multiplier_max:
-
-            step_variation = random.uniform(0.9, 1.1)
-            step = base_step * step_variation
-
-            if current >= 30:
-                step *= 2.5
-            elif current >= 20:
-                step *= 2
-            elif current >= 10:
-                step *= 1.5
-
-            current = round(current + step, 2)
-
-            await websocket.send_json({
-                "multiplier": current
-            })
-
-            sleep_time = max(
-                0.02,
-                0.1 - (current // 10) * 0.01 + random.uniform(-0.01, 0.01)
-            )
-
-            await asyncio.sleep(sleep_time)
-
-        game["finished"] = True
-
+        # départ : le client interpole avec multiplier = exp(growth * t)
         await websocket.send_json({
-            "event": "crash",
-            "final_multiplier": multiplier_max
+            "event": "start",
+            "started_at": game.started_at,
+            "elapsed": elapsed_since(game.started_at),
+            "growth": CRASH_CURVE_GROWTH,
+            "multiplier": multiplier_at(elapsed_since(game.started_at))
         })
 
-        await websocket.close()
+        while True:
+            data = await sub.queue.get()
+            if data is END_OF_STREAM:
+                break
+            await websocket.send_text(data)
+
+        if sub.dropped:
+            # client trop lent : il se reconnecte et reçoit un nouveau départ
+            await websocket.close(code=1013)
+        else:
+            await websocket.close()
 
     except WebSocketDisconnect:
-        print(f"Client déconnecté du jeu {game_id}")
\ No newline at end of file
+        print(f"Client déconnecté du jeu {game_id}")
+
+    finally:
+        channel.unsubscribe(sub)
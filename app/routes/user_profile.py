@@ -8,7 +8,8 @@ import shutil
 from uuid import uuid4
 
 from app.database import get_async_session
-from app.dependencies.auth import get_current_user
+from app.dependencies.read_session import get_read_session
+from app.dependencies.auth import get_current_user_model, invalidate_principal
 from app.models import User
 from app.schemas import UserOut
 
@@ -19,7 +20,7 @@ router = APIRouter(prefix="/users", tags=["Users"])
 
 
 @router.get("/me", response_model=UserOut)
-async def get_my_profile(current_user: User = Depends(get_current_user)):
+async def get_my_profile(current_user: User = Depends(get_current_user_model)):
     """
     Retourne le profil de l'utilisateur actuellement connecté.
     """
@@ -27,7 +28,7 @@ async def get_my_profile(current_user: User = Depends(get_current_user)):
 
 
 @router.get("/{user_id}", response_model=UserOut)
-async def get_user_profile(user_id: int, db: AsyncSession = Depends(get_async_session)):
+async def get_user_profile(user_id: int, db: AsyncSession = Depends(get_read_session)):
     """
     Récupère le profil public d'un utilisateur à partir de son ID.
     """
@@ -43,7 +44,7 @@ async def get_user_profile(user_id: int, db: AsyncSession = Depends(get_async_se
 @router.post("/update-profile", response_model=UserOut)
 async def update_profile(
     db: AsyncSession = Depends(get_async_session),
-    current_user: User = Depends(get_current_user),
+    current_user: User = Depends(get_current_user_model),
     first_name: Optional[str] = Form(None),
     last_name: Optional[str] = Form(None),
     phone: Optional[str] = Form(None),
@@ -81,5 +82,6 @@ async def update_profile(
 
     await db.commit()
     await db.refresh(current_user)
+    invalidate_principal(current_user.email)
 
     return current_user
@@ -3,7 +3,7 @@ from fastapi import APIRouter, Depends, HTTPException, Body
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.database import get_async_session
 from app.services.wallet_service import credit_wallet, debit_wallet, get_wallet_balance
-from app.routers.auth import get_current_user
+from app.dependencies.auth import get_current_user
 
 router = APIRouter(
     prefix="/wallet",
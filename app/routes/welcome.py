@@ -6,7 +6,7 @@ from app.database import get_async_session
 from app.models import User
 from app.services.bonus_service import add_bonus_points  # ✅ déplacé ici
 from app.services.balance_service import credit_balance, get_user_balance
-from app.routers.auth import get_current_user
+from app.dependencies.auth import get_current_user_model, invalidate_principal
 import logging
 
 router = APIRouter(prefix="/welcome", tags=["Welcome"])
@@ -32,7 +32,7 @@ class CompleteTasksRequest(BaseModel):
 )
 async def complete_welcome_tasks(
     data: CompleteTasksRequest,
-    current_user: User = Depends(get_current_user),
+    current_user: User = Depends(get_current_user_model),
     db: AsyncSession = Depends(get_async_session)
 ):
     """
@@ -69,6 +69,7 @@ async def complete_welcome_tasks(
 
         await db.commit()
         await db.refresh(current_user)
+        invalidate_principal(current_user.email)
 
         return {
             "success": True,
@@ -27,6 +27,8 @@ class MiningStatusResponse(BaseModel):
     user_id: int
     total_points: int
     level: int
+    next_level_at: Optional[int] = None
+    progress_percent: float = 0.0
 
 
 class AddMiningResponse(BaseModel):
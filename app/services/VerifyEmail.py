@@ -9,12 +9,9 @@ from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 
-from passlib.context import CryptContext
 from app.models import PendingUser
 from app.schemas import RegisterRequest
-
-# Contexte pour le hachage des mots de passe
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+from app.services.password_service import pwd_context, hash_password
 
 # Variables d'environnement SMTP et admin
 EMAIL_HOST = os.getenv("EMAIL_HOST")
@@ -108,7 +105,7 @@ async def process_registration(form: RegisterRequest, session: AsyncSession):
 
     # Génère un nouveau code
     code = generate_code()
-    hashed_password = pwd_context.hash(form.password)
+    hashed_password = await hash_password(form.password)
 
     if existing:
         # Mise à jour de l'entrée existante non vérifiée
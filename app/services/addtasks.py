@@ -3,6 +3,7 @@ import random
 import string
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.models import Task
+from app.services.catalog_cache import task_catalog
 
 def generate_code(length: int = 4) -> str:
     """Génère un code aléatoire de validation (4 lettres/chiffres)."""
@@ -30,6 +31,7 @@ async def add_task(
     db.add(task)
     await db.commit()
     await db.refresh(task)
+    task_catalog.invalidate()
     return task
 
 
@@ -3,6 +3,7 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from app.models import Balance
+from app.services.ledger import upsert_balance, debit_balance_if_sufficient
 
 
 async def credit_balance(db: AsyncSession, user_id: int, points: int) -> int:
@@ -13,19 +14,7 @@ async def credit_balance(db: AsyncSession, user_id: int, points: int) -> int:
     if points <= 0:
         raise ValueError("Le nombre de points doit être positif")
 
-    result = await db.execute(
-        select(Balance).where(Balance.user_id == user_id)
-    )
-    balance = result.scalars().first()
-
-    if balance:
-        balance.points += points
-    else:
-        balance = Balance(user_id=user_id, points=points)
-        db.add(balance)
-
-    await db.flush()  # synchronise sans fermer la transaction
-    return balance.points
+    return await upsert_balance(db, user_id, points)
 
 
 async def debit_balance(db: AsyncSession, user_id: int, points: int) -> int:
@@ -36,18 +25,12 @@ async def debit_balance(db: AsyncSession, user_id: int, points: int) -> int:
     if points <= 0:
         raise ValueError("Le nombre de points doit être positif")
 
-    result = await db.execute(
-        select(Balance).where(Balance.user_id == user_id)
-    )
-    balance = result.scalars().first()
+    new_total = await debit_balance_if_sufficient(db, user_id, points)
 
-    if not balance or balance.points < points:
+    if new_total is None:
         raise ValueError("Solde insuffisant")
 
-    balance.points -= points
-
-    await db.flush()
-    return balance.points
+    return new_total
 
 
 async def get_user_balance(db: AsyncSession, user_id: int) -> int:
@@ -55,7 +38,7 @@ async def get_user_balance(db: AsyncSession, user_id: int) -> int:
     Retourne le total de points d’un utilisateur.
     """
     result = await db.execute(
-        select(Balance).where(Balance.user_id == user_id)
+        select(Balance.points).where(Balance.user_id == user_id)
     )
-    balance = result.scalars().first()
-    return balance.points if balance else 0
\ No newline at end of file
+    points = result.scalar_one_or_none()
+    return points if points is not None else 0
@@ -1,51 +1,131 @@
 # app/services/bonus_service.py
 
+import os
 from decimal import Decimal
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from sqlalchemy import func
+from sqlalchemy import event, func
+from sqlalchemy.orm import Session
 from datetime import datetime
 
-from app.models import Bonus, BonusStatus, Wallet, Friend, UserAction, Action, ActionCategory
+from app.models import (
+    Bonus, BonusStatus, Wallet, Friend, UserAction, Action, ActionCategory,
+    UserPack, RealCash,
+)
+from app.services.ledger import upsert_bonus_points
+from app.services.ledger_journal import ACCOUNT_BONUS, ACCOUNT_WALLET, record_entry
+from app.utils.ttl_cache import TTLCache
 
 
 # ==========================================================
-# 🧩 Vérifier l’éligibilité d’un bonus
+# 🧩 Conditions bonus (une seule requête, cache court)
 # ==========================================================
-async def check_bonus_eligibility(db: AsyncSession, user_id: int):
+
+BONUS_CONDITIONS_TTL_SECONDS = float(os.getenv("BONUS_CONDITIONS_TTL_SECONDS", 30))
+
+bonus_conditions_cache = TTLCache(
+    ttl_seconds=BONUS_CONDITIONS_TTL_SECONDS,
+    max_size=int(os.getenv("BONUS_CONDITIONS_CACHE_SIZE", 10_000)),
+)
+
+
+_STALE_CONDITIONS_KEY = "stale_bonus_conditions"
+
+
+def invalidate_bonus_conditions(user_id: int) -> None:
+    """À appeler après achat de pack, dépôt ou nouvel ami accepté (transaction commitée)."""
+    bonus_conditions_cache.invalidate(user_id)
+
+
+def invalidate_bonus_conditions_on_commit(db: AsyncSession, user_id: int) -> None:
     """
-    Vérifie si un utilisateur remplit les conditions
-    pour rendre son bonus éligible.
-    Ne fait PAS de commit.
+    Variante pour les services qui ne commitent pas : l'invalidation a lieu
+    après le commit de l'appelant (sinon une lecture concurrente
+    remettrait en cache l'état d'avant commit).
     """
+    db.info.setdefault(_STALE_CONDITIONS_KEY, set()).add(user_id)
 
-    # Vérifier pack finance
-    pack_query = (
-        select(UserAction)
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed_conditions(session: Session):
+    for user_id in session.info.pop(_STALE_CONDITIONS_KEY, ()):
+        bonus_conditions_cache.invalidate(user_id)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_stale_conditions(session: Session, previous_transaction):
+    session.info.pop(_STALE_CONDITIONS_KEY, None)
+
+
+async def fetch_bonus_conditions(db: AsyncSession, user_id: int, use_cache: bool = True) -> dict:
+    """
+    Récupère en UN aller-retour tous les faits utiles aux conditions bonus :
+    pack, action finance, dépôt real_cash, dépôt wallet, nombre d'amis.
+    """
+    if use_cache:
+        cached = bonus_conditions_cache.get(user_id)
+        if cached is not None:
+            return dict(cached)
+
+    stmt = select(
+        select(UserPack.id)
+        .where(UserPack.user_id == user_id)
+        .exists()
+        .label("has_user_pack"),
+        select(UserAction.id)
         .join(Action)
         .where(
             UserAction.user_id == user_id,
             Action.category == ActionCategory.finance
         )
-    )
-    has_pack = (await db.execute(pack_query)).scalars().first() is not None
-
-    # Vérifier dépôt dans le wallet
-    wallet_query = select(Wallet).where(Wallet.user_id == user_id)
-    wallet = (await db.execute(wallet_query)).scalars().first()
-    has_deposit = wallet and (wallet.amount or Decimal("0")) > 0
-
-    # Vérifier amis
-    friends_query = (
+        .exists()
+        .label("has_finance_action"),
+        select(RealCash.id)
+        .where(RealCash.user_id == user_id, RealCash.cash_balance > 0)
+        .exists()
+        .label("has_cash_deposit"),
+        select(Wallet.id)
+        .where(Wallet.user_id == user_id, Wallet.amount > 0)
+        .exists()
+        .label("has_wallet_deposit"),
         select(func.count())
         .select_from(Friend)
         .where(
             Friend.user_id == user_id,
             Friend.status == "accepted"
         )
+        .scalar_subquery()
+        .label("friends_count"),
     )
-    friends_count = (await db.execute(friends_query)).scalar() or 0
-    has_3_friends = friends_count >= 3
+
+    row = (await db.execute(stmt)).one()
+    facts = {
+        "has_user_pack": bool(row.has_user_pack),
+        "has_finance_action": bool(row.has_finance_action),
+        "has_cash_deposit": bool(row.has_cash_deposit),
+        "has_wallet_deposit": bool(row.has_wallet_deposit),
+        "friends_count": int(row.friends_count or 0),
+    }
+
+    bonus_conditions_cache.set(user_id, facts)
+    return dict(facts)
+
+
+# ==========================================================
+# 🧩 Vérifier l’éligibilité d’un bonus
+# ==========================================================
+async def check_bonus_eligibility(db: AsyncSession, user_id: int):
+    """
+    Vérifie si un utilisateur remplit les conditions
+    pour rendre son bonus éligible.
+    Ne fait PAS de commit.
+    """
+
+    facts = await fetch_bonus_conditions(db, user_id, use_cache=False)
+
+    has_pack = facts["has_finance_action"]
+    has_deposit = facts["has_wallet_deposit"]
+    has_3_friends = facts["friends_count"] >= 3
 
     if has_pack and has_deposit and has_3_friends:
         bonus_query = select(Bonus).where(
@@ -73,9 +153,13 @@ PACK_CONVERSION_RATES = {
     "Platinum": Decimal("0.15"),
 }
 
+# Taux appliqué aux packs absents de la table
+DEFAULT_CONVERSION_RATE = Decimal("0.02")
+
 async def convert_daily_bonus(db: AsyncSession, user_id: int):
     """
-    Convertit chaque jour un pourcentage du bonus vers le wallet.
+    Convertit chaque jour un pourcentage du bonus vers le wallet (un utilisateur).
+    Le passage quotidien pour tous passe par app/tasks/convert_bonus_daily.py.
     Ne fait PAS de commit.
     """
 
@@ -101,7 +185,7 @@ async def convert_daily_bonus(db: AsyncSession, user_id: int):
     if not user_pack:
         return {"error": "Aucun pack trouvé pour cet utilisateur."}
 
-    taux = PACK_CONVERSION_RATES.get(user_pack.name, Decimal("0.02"))
+    taux = PACK_CONVERSION_RATES.get(user_pack.name, DEFAULT_CONVERSION_RATE)
 
     points_restants = bonus.points_restants or Decimal("0")
     montant_converti = (points_restants * taux).quantize(Decimal("0.01"))
@@ -121,6 +205,10 @@ async def convert_daily_bonus(db: AsyncSession, user_id: int):
 
     wallet.amount = (wallet.amount or Decimal("0")) + montant_converti
 
+    # 🧾 journal : débit bonus + crédit wallet (comme la conversion ensembliste)
+    record_entry(db, ACCOUNT_BONUS, user_id, -montant_converti, "bonus_conversion")
+    record_entry(db, ACCOUNT_WALLET, user_id, montant_converti, "bonus_conversion")
+
     if bonus.points_restants <= 0:
         bonus.status = BonusStatus.converti
 
@@ -148,25 +236,10 @@ async def add_bonus_points(db: AsyncSession, user_id: int, amount: Decimal):
     if not isinstance(amount, Decimal):
         amount = Decimal(str(amount))
 
-    bonus_query = select(Bonus).where(Bonus.user_id == user_id)
-    bonus = (await db.execute(bonus_query)).scalars().first()
-
-    if not bonus:
-        bonus = Bonus(
-            user_id=user_id,
-            points_restants=amount,
-            valeur_equivalente=Decimal("0"),
-            status=BonusStatus.en_attente,
-            cree_le=datetime.utcnow(),
-        )
-        db.add(bonus)
-    else:
-        bonus.points_restants = (bonus.points_restants or Decimal("0")) + amount
-
-    await db.flush()
+    total_bonus = await upsert_bonus_points(db, user_id, amount)
 
     return {
         "success": True,
         "message": f"{amount} points bonus ajoutés.",
-        "total_bonus": bonus.points_restants
-    }
\ No newline at end of file
+        "total_bonus": total_bonus
+    }
@@ -6,6 +6,8 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import HTTPException
 
 from app.models import RealCash, User
+from app.services.ledger import upsert_real_cash, debit_real_cash_if_sufficient
+from app.services.bonus_service import invalidate_bonus_conditions_on_commit
 
 
 # -----------------------------------------------------------------
@@ -25,27 +27,27 @@ async def debit_real_cash(user: User, amount: float, db: AsyncSession) -> RealCa
 
     amount_decimal = Decimal(str(amount))
 
-    result = await db.execute(
-        select(RealCash).where(RealCash.user_id == user.id)
-    )
-    real_cash = result.scalars().first()
+    real_cash = await debit_real_cash_if_sufficient(db, user.id, amount_decimal)
 
-    if not real_cash:
-        raise HTTPException(
-            status_code=404,
-            detail="Compte RealCash introuvable."
-        )
+    if real_cash is None:
+        exists = (
+            await db.execute(
+                select(RealCash.id).where(RealCash.user_id == user.id)
+            )
+        ).first()
 
-    current_balance = real_cash.cash_balance or Decimal("0")
+        if not exists:
+            raise HTTPException(
+                status_code=404,
+                detail="Compte RealCash introuvable."
+            )
 
-    if current_balance < amount_decimal:
         raise HTTPException(
             status_code=400,
             detail="Solde insuffisant sur le compte RealCash."
         )
 
-    real_cash.cash_balance = current_balance - amount_decimal
-
+    invalidate_bonus_conditions_on_commit(db, user.id)
     return real_cash
 
 
@@ -66,20 +68,8 @@ async def credit_real_cash(user: User, amount: float, db: AsyncSession) -> RealC
 
     amount_decimal = Decimal(str(amount))
 
-    result = await db.execute(
-        select(RealCash).where(RealCash.user_id == user.id)
-    )
-    real_cash = result.scalars().first()
-
-    if not real_cash:
-        real_cash = RealCash(
-            user_id=user.id,
-            cash_balance=amount_decimal
-        )
-        db.add(real_cash)
-    else:
-        real_cash.cash_balance = (real_cash.cash_balance or Decimal("0")) + amount_decimal
-
+    real_cash = await upsert_real_cash(db, user.id, amount_decimal)
+    invalidate_bonus_conditions_on_commit(db, user.id)
     return real_cash
 
 
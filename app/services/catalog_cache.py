@@ -0,0 +1,140 @@
+# app/services/catalog_cache.py
+
+# Catalogues en lecture seule (packs, tâches) servis depuis la mémoire :
+# - une requête + une sérialisation Pydantic par version, zéro ensuite
+# - le JSON est pré-encodé en octets, l'ETag est un hash du contenu
+#   (identique d'un worker à l'autre)
+# - If-None-Match -> 304 sans corps
+# - invalidate() à chaque écriture (create_action, add_task) ;
+#   le TTL reste le filet de sécurité multi-workers (et seed_packs.py)
+
+import asyncio
+import hashlib
+import json
+import os
+import time
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from fastapi import Request, Response
+from pydantic import TypeAdapter
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.models import Action, Task
+from app.schemas import ActionSchema, TaskSchema
+
+# ⏱️ Durée de vie max d'une version (filet de sécurité multi-workers)
+CATALOG_TTL_SECONDS = float(os.getenv("CATALOG_TTL_SECONDS", os.getenv("TASK_CATALOG_TTL_SECONDS", 300)))
+
+
+def _encode(items: List[dict]) -> bytes:
+    return json.dumps(items, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class CatalogSnapshot:
+    """Une version du catalogue : éléments (dicts JSON) + corps pré-encodés par filtre."""
+
+    __slots__ = ("version", "items", "loaded_at", "_bodies")
+
+    def __init__(self, version: int, items: List[dict]):
+        self.version = version
+        self.items = items
+        self.loaded_at = time.monotonic()
+        # filtre (None = tout) -> (octets, etag)
+        self._bodies: Dict[Optional[tuple], tuple] = {}
+
+    def body(self, field: Optional[str] = None, value=None) -> tuple:
+        """
+        Corps JSON et ETag, pour tout le catalogue ou les éléments où item[field] == value.
+        Un corps est conservé par filtre : `value` doit venir d'un domaine borné (enum).
+        """
+        key = None if field is None else (field, value)
+        cached = self._bodies.get(key)
+        if cached is None:
+            items = self.items if field is None else [i for i in self.items if i.get(field) == value]
+            data = _encode(items)
+            etag = f'"{hashlib.blake2b(data, digest_size=12).hexdigest()}"'
+            cached = self._bodies[key] = (data, etag)
+        return cached
+
+
+class CatalogCache:
+
+    def __init__(self, name: str, loader: Callable[[AsyncSession], Awaitable[List[dict]]]):
+        self.name = name
+        self.loader = loader
+        self._version = 0
+        self._snapshot: Optional[CatalogSnapshot] = None
+        self._lock = asyncio.Lock()
+        self.loads = 0
+
+    def invalidate(self) -> None:
+        """À appeler après toute création/modification du catalogue."""
+        self._version += 1
+        self._snapshot = None
+
+    def _fresh(self) -> Optional[CatalogSnapshot]:
+        snapshot = self._snapshot
+        if snapshot is not None and time.monotonic() - snapshot.loaded_at < CATALOG_TTL_SECONDS:
+            return snapshot
+        return None
+
+    async def get(self, db: AsyncSession) -> CatalogSnapshot:
+        snapshot = self._fresh()
+        if snapshot is not None:
+            return snapshot
+
+        # un seul chargement à la fois : les autres attendent la même version
+        async with self._lock:
+            snapshot = self._fresh()
+            if snapshot is not None:
+                return snapshot
+
+            version = self._version
+            snapshot = CatalogSnapshot(version, await self.loader(db))
+            self.loads += 1
+
+            # invalidé pendant le chargement : servi une fois, pas conservé
+            if version == self._version:
+                self._snapshot = snapshot
+            return snapshot
+
+
+def catalog_response(request: Request, body: tuple) -> Response:
+    """Réponse JSON pré-encodée, ou 304 si le client a déjà cette version."""
+    data, etag = body
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        tags = {t.strip().removeprefix("W/") for t in if_none_match.split(",")}
+        if etag in tags or "*" in tags:
+            return Response(status_code=304, headers=headers)
+
+    return Response(content=data, media_type="application/json", headers=headers)
+
+
+# =========================================================
+# CATALOGUES
+# =========================================================
+
+_actions_adapter = TypeAdapter(List[ActionSchema])
+_tasks_adapter = TypeAdapter(List[TaskSchema])
+
+
+async def _load_actions(db: AsyncSession) -> List[dict]:
+    actions = (await db.execute(select(Action).order_by(Action.id))).scalars().all()
+    return _actions_adapter.dump_python(
+        _actions_adapter.validate_python(actions, from_attributes=True), mode="json"
+    )
+
+
+async def _load_tasks(db: AsyncSession) -> List[dict]:
+    tasks = (await db.execute(select(Task).order_by(Task.id))).scalars().all()
+    return _tasks_adapter.dump_python(
+        _tasks_adapter.validate_python(tasks, from_attributes=True), mode="json"
+    )
+
+
+action_catalog = CatalogCache("actions", _load_actions)
+task_catalog = CatalogCache("tasks", _load_tasks)
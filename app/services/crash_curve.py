@@ -0,0 +1,57 @@
+# app/services/crash_curve.py
+
+# Courbe de crash déterministe (tradegame) :
+#   multiplicateur(t) = exp(CRASH_CURVE_GROWTH * t), t = secondes depuis le départ
+# Le point de crash est tiré d'une graine propre à la partie.
+# Le serveur calcule le multiplicateur courant en O(1) ; le client interpole
+# entre les points de contrôle envoyés par le WebSocket.
+
+import math
+import os
+import random
+import secrets
+import time
+
+# Croissance de la courbe (par seconde) : x2 en ~5.8 s, x100 en ~38 s
+CRASH_CURVE_GROWTH = float(os.getenv("CRASH_CURVE_GROWTH", 0.12))
+
+# Intervalle entre deux points de contrôle WebSocket
+CRASH_CHECKPOINT_SECONDS = float(os.getenv("CRASH_CHECKPOINT_SECONDS", 0.5))
+
+
+def new_seed() -> int:
+    return secrets.randbits(63)
+
+
+def crash_point(seed: int) -> float:
+    """Point de crash de la partie (même distribution qu'avant, mais rejouable)."""
+    rng = random.Random(seed)
+    r = rng.random()
+
+    if r < 0.8:
+        return round(rng.uniform(1.0, 5.0), 2)
+
+    elif r < 0.9:
+        return round(rng.uniform(5.0, 20.0), 2)
+
+    elif r < 0.97:
+        return round(rng.uniform(20.0, 100.0), 2)
+
+    else:
+        return round(rng.uniform(100.0, 500.0), 2)
+
+
+def multiplier_at(elapsed: float, growth: float = CRASH_CURVE_GROWTH) -> float:
+    """Multiplicateur après `elapsed` secondes (arrondi à l'inférieur, 2 décimales)."""
+    if elapsed <= 0:
+        return 1.0
+    return math.floor(math.exp(growth * elapsed) * 100) / 100
+
+
+def crash_elapsed(crash: float, growth: float = CRASH_CURVE_GROWTH) -> float:
+    """Secondes écoulées au moment du crash."""
+    return math.log(max(crash, 1.0)) / growth
+
+
+def elapsed_since(started_at: float) -> float:
+    return max(0.0, time.time() - started_at)
@@ -0,0 +1,159 @@
+# app/services/credit_coalescer.py
+
+# Regroupement des crédits de points à haute fréquence (cashouts de jeux) :
+# - les crédits sont mis en attente quelques millisecondes, cumulés par utilisateur
+# - puis écrits en UN upsert multi-lignes, dans une transaction dédiée
+# - chaque appelant n'est libéré qu'après le commit (durabilité avant réponse)
+
+import asyncio
+import logging
+import os
+from collections import defaultdict
+from typing import Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import insert
+
+from app.database import AsyncSessionLocal
+from app.models import Balance
+from app.services.ledger_journal import ACCOUNT_BALANCE, record_entry
+
+logger = logging.getLogger(__name__)
+
+# ⏱️ Fenêtre de regroupement et taille max d'un lot
+CREDIT_COALESCE_WINDOW_MS = float(os.getenv("CREDIT_COALESCE_WINDOW_MS", 5))
+CREDIT_COALESCE_MAX_BATCH = int(os.getenv("CREDIT_COALESCE_MAX_BATCH", 500))
+
+
+class _PendingCredit:
+    __slots__ = ("points", "entry_type", "reference", "future")
+
+    def __init__(self, points: int, entry_type: str, reference: Optional[str], future: asyncio.Future):
+        self.points = points
+        self.entry_type = entry_type
+        self.reference = reference
+        self.future = future
+
+
+class CreditCoalescer:
+
+    def __init__(self, window_ms: float, max_batch: int):
+        self.window = window_ms / 1000
+        self.max_batch = max_batch
+        self._pending: Dict[int, List[_PendingCredit]] = defaultdict(list)
+        self._count = 0
+        self._timer: Optional[asyncio.TimerHandle] = None
+        # références fortes : une tâche de flush ne doit pas être ramassée en cours d'écriture
+        self._flush_tasks: Set[asyncio.Task] = set()
+        self.flushes = 0
+        self.credits = 0
+        self.isolated_failures = 0
+
+    async def credit(self, user_id: int, points: int, entry_type: str = "credit",
+                     reference: Optional[str] = None) -> int:
+        """Crédite `points` et retourne le nouveau solde, une fois commité."""
+        if points <= 0:
+            raise ValueError("Le nombre de points doit être positif")
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending[user_id].append(_PendingCredit(int(points), entry_type, reference, future))
+        self._count += 1
+
+        if self._count >= self.max_batch:
+            self._schedule_flush(loop, delay=0)
+        elif self._timer is None:
+            self._schedule_flush(loop, delay=self.window)
+
+        return await future
+
+    def _schedule_flush(self, loop: asyncio.AbstractEventLoop, delay: float):
+        if self._timer is not None:
+            self._timer.cancel()
+        self._timer = loop.call_later(delay, self._start_flush)
+
+    def _start_flush(self):
+        task = asyncio.ensure_future(self._flush())
+        self._flush_tasks.add(task)
+        task.add_done_callback(self._flush_tasks.discard)
+
+    async def _flush(self):
+        self._timer = None
+        batch, self._pending = self._pending, defaultdict(list)
+        self._count = 0
+        if not batch:
+            return
+
+        try:
+            totals = await self._write(batch)
+        except Exception as e:
+            # une ligne invalide (utilisateur supprimé...) ne doit pas faire perdre
+            # les gains des autres : chaque utilisateur est réécrit seul
+            logger.warning(f"[credit_coalescer] Échec du lot ({len(batch)} utilisateurs), reprise isolée : {e}")
+            await self._write_isolated(batch)
+            return
+
+        self.flushes += 1
+        for user_id, credits in batch.items():
+            self._resolve(credits, totals[user_id])
+
+    def _resolve(self, credits: List[_PendingCredit], total: int):
+        self.credits += len(credits)
+        for credit in credits:
+            if not credit.future.done():
+                credit.future.set_result(total)
+
+    async def _write_isolated(self, batch: Dict[int, List[_PendingCredit]]):
+        for user_id, credits in sorted(batch.items()):
+            try:
+                totals = await self._write({user_id: credits})
+            except Exception as e:
+                self.isolated_failures += 1
+                logger.error(f"[credit_coalescer] Crédit refusé pour l'utilisateur {user_id} : {e}")
+                for credit in credits:
+                    if not credit.future.done():
+                        credit.future.set_exception(e)
+                continue
+
+            self.flushes += 1
+            self._resolve(credits, totals[user_id])
+
+    async def _write(self, batch: Dict[int, List[_PendingCredit]]) -> Dict[int, int]:
+        # ordre stable des user_id : pas d'interblocage entre deux lots
+        rows: List[Tuple[int, int]] = sorted(
+            (user_id, sum(c.points for c in credits)) for user_id, credits in batch.items()
+        )
+
+        async with AsyncSessionLocal() as db:
+            stmt = insert(Balance).values(
+                [{"user_id": user_id, "points": points} for user_id, points in rows]
+            )
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[Balance.user_id],
+                set_={
+                    "points": Balance.points + stmt.excluded.points,
+                    "last_updated": func.now(),
+                },
+            ).returning(Balance.user_id, Balance.points)
+
+            totals = {row.user_id: int(row.points) for row in await db.execute(stmt)}
+
+            for user_id, credits in batch.items():
+                for credit in credits:
+                    record_entry(db, ACCOUNT_BALANCE, user_id, credit.points, credit.entry_type, credit.reference)
+
+            await db.commit()
+
+        return totals
+
+    def stats(self) -> dict:
+        return {
+            "pending": self._count,
+            "flushes": self.flushes,
+            "credits": self.credits,
+            "credits_per_flush": round(self.credits / self.flushes, 2) if self.flushes else 0,
+            "isolated_failures": self.isolated_failures,
+        }
+
+
+credit_coalescer = CreditCoalescer(CREDIT_COALESCE_WINDOW_MS, CREDIT_COALESCE_MAX_BATCH)
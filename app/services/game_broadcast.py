@@ -0,0 +1,134 @@
+# app/services/game_broadcast.py
+
+# Diffusion partagée des parties (WebSocket) :
+# - une seule boucle par partie, quel que soit le nombre de spectateurs
+# - chaque frame est sérialisée une fois puis distribuée à tous les abonnés
+# - file d'envoi bornée par abonné : un client trop lent est déconnecté
+
+import asyncio
+import json
+import logging
+import os
+from typing import AsyncIterator, Callable, Dict, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+# Frames en attente max par client avant déconnexion
+BROADCAST_QUEUE_SIZE = int(os.getenv("BROADCAST_QUEUE_SIZE", 16))
+
+# Fin de flux (None dans la file)
+END_OF_STREAM = None
+
+
+class Subscriber:
+    __slots__ = ("queue", "dropped")
+
+    def __init__(self):
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=BROADCAST_QUEUE_SIZE)
+        self.dropped = False
+
+    def close(self, dropped: bool = False):
+        """Place la fin de flux ; si le client est en retard, ses frames sont abandonnées."""
+        if not dropped:
+            try:
+                self.queue.put_nowait(END_OF_STREAM)
+                return
+            except asyncio.QueueFull:
+                pass
+
+        self.dropped = True
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.queue.put_nowait(END_OF_STREAM)
+
+
+class GameChannel:
+    """Une partie diffusée : un producteur, N abonnés."""
+
+    def __init__(self, game_id: str, on_close: Callable[["GameChannel"], None]):
+        self.game_id = game_id
+        self.subscribers: Set[Subscriber] = set()
+        self.frames_sent = 0
+        self.dropped = 0
+        self._on_close = on_close
+        self._task: Optional[asyncio.Task] = None
+        self.closing = False
+
+    def start(self, frames: AsyncIterator[dict]):
+        self._task = asyncio.create_task(self._run(frames))
+
+    def subscribe(self) -> Subscriber:
+        sub = Subscriber()
+        self.subscribers.add(sub)
+        return sub
+
+    def unsubscribe(self, sub: Subscriber):
+        self.subscribers.discard(sub)
+        # plus personne ne regarde : inutile de continuer la boucle
+        if not self.subscribers and self._task is not None and not self._task.done():
+            self.closing = True
+            self._task.cancel()
+
+    def publish(self, frame: dict):
+        data = json.dumps(frame)  # une seule sérialisation par frame
+        self.frames_sent += 1
+
+        for sub in list(self.subscribers):
+            try:
+                sub.queue.put_nowait(data)
+            except asyncio.QueueFull:
+                self.subscribers.discard(sub)
+                self.dropped += 1
+                sub.close(dropped=True)
+
+    async def _run(self, frames: AsyncIterator[dict]):
+        try:
+            async for frame in frames:
+                self.publish(frame)
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            logger.error(f"[broadcast] Erreur sur la partie {self.game_id} : {e}")
+        finally:
+            self.closing = True
+            for sub in list(self.subscribers):
+                sub.close()
+            self.subscribers.clear()
+            self._on_close(self)
+
+
+class BroadcastHub:
+    """Registre des parties diffusées dans ce process."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.channels: Dict[str, GameChannel] = {}
+        self.frames_sent = 0
+        self.dropped = 0
+
+    def join(self, game_id: str, frames_factory: Callable[[], AsyncIterator[dict]]) -> tuple[GameChannel, Subscriber]:
+        """Abonne un client ; démarre le producteur au premier abonné."""
+        channel = self.channels.get(game_id)
+        if channel is None or channel.closing:
+            channel = GameChannel(game_id, on_close=self._remove)
+            self.channels[game_id] = channel
+            sub = channel.subscribe()
+            channel.start(frames_factory())
+            return channel, sub
+
+        return channel, channel.subscribe()
+
+    def _remove(self, channel: GameChannel):
+        self.frames_sent += channel.frames_sent
+        self.dropped += channel.dropped
+        if self.channels.get(channel.game_id) is channel:
+            del self.channels[channel.game_id]
+
+    def stats(self) -> dict:
+        return {
+            "hub": self.name,
+            "channels": len(self.channels),
+            "subscribers": sum(len(c.subscribers) for c in self.channels.values()),
+            "frames_sent": self.frames_sent + sum(c.frames_sent for c in self.channels.values()),
+            "dropped": self.dropped + sum(c.dropped for c in self.channels.values()),
+        }
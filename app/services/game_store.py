@@ -0,0 +1,293 @@
+# app/services/game_store.py
+
+# Stockage des parties en cours (luckygame, tradegame).
+# - Enregistrements compacts (__slots__) au lieu de dicts
+# - Backend "memory" : TTL + plafond LRU, par process
+# - Backend "postgres" : table game_states, partagée entre workers
+# Les parties terminées expirent vite, les parties abandonnées après le TTL actif.
+
+import logging
+import os
+from datetime import datetime, timedelta
+from typing import Dict
+
+from sqlalchemy import delete, select, update
+from sqlalchemy.dialects.postgresql import insert
+
+from app.database import AsyncSessionLocal
+from app.models import GameState
+from app.utils.metrics import counter, gauge
+from app.utils.ttl_cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+# "memory" (par process) ou "postgres" (partagé entre workers)
+GAME_STATE_BACKEND = os.getenv("GAME_STATE_BACKEND", "memory")
+
+# ⏱️ Partie active sans activité / partie terminée
+GAME_STATE_TTL_SECONDS = float(os.getenv("GAME_STATE_TTL_SECONDS", 3600))
+GAME_STATE_FINISHED_TTL_SECONDS = float(os.getenv("GAME_STATE_FINISHED_TTL_SECONDS", 60))
+
+# 📦 Plafond mémoire (nombre de parties par store)
+GAME_STATE_MAX_ENTRIES = int(os.getenv("GAME_STATE_MAX_ENTRIES", 50_000))
+
+# Purge complète des entrées expirées toutes les N écritures
+GAME_STATE_PURGE_EVERY = int(os.getenv("GAME_STATE_PURGE_EVERY", 1000))
+
+
+# =========================================================
+# ENREGISTREMENTS
+# =========================================================
+
+class LuckyGameState:
+    __slots__ = ("user_id", "current_level", "current_reward", "active", "multipliers", "version")
+
+    def __init__(self, user_id: int, current_level: int, current_reward: float,
+                 active: bool, multipliers: list, version: int = 0):
+        self.user_id = user_id
+        self.current_level = current_level
+        self.current_reward = current_reward
+        self.active = active
+        self.multipliers = multipliers
+        self.version = version
+
+    @property
+    def finished(self) -> bool:
+        return not self.active
+
+    def to_dict(self) -> dict:
+        return {
+            "user_id": self.user_id,
+            "current_level": self.current_level,
+            "current_reward": self.current_reward,
+            "active": self.active,
+            "multipliers": self.multipliers,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict, version: int = 0) -> "LuckyGameState":
+        return cls(version=version, **data)
+
+
+class TradeBet:
+    __slots__ = ("amount", "cashed_out")
+
+    def __init__(self, amount: int, cashed_out: bool = False):
+        self.amount = amount
+        self.cashed_out = cashed_out
+
+
+class TradeGameState:
+    __slots__ = ("user_id", "logo", "seed", "multiplier_max", "started_at", "bets", "finished", "version")
+
+    def __init__(self, user_id: int, logo: str, seed: int, multiplier_max: float, started_at: float,
+                 bets: Dict[str, TradeBet], finished: bool = False, version: int = 0):
+        self.user_id = user_id
+        self.logo = logo
+        self.seed = seed
+        self.multiplier_max = multiplier_max
+        self.started_at = started_at  # epoch (s), départ de la courbe
+        self.bets = bets
+        self.finished = finished
+        self.version = version
+
+    def to_dict(self) -> dict:
+        return {
+            "user_id": self.user_id,
+            "logo": self.logo,
+            "seed": self.seed,
+            "multiplier_max": self.multiplier_max,
+            "started_at": self.started_at,
+            "bets": {k: [b.amount, b.cashed_out] for k, b in self.bets.items()},
+            "finished": self.finished,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict, version: int = 0) -> "TradeGameState":
+        data = dict(data)
+        data["bets"] = {k: TradeBet(*v) for k, v in data["bets"].items()}
+        return cls(version=version, **data)
+
+
+# =========================================================
+# BACKEND MÉMOIRE
+# =========================================================
+
+class MemoryGameStore:
+    """
+    Store par process. Les objets sont gardés tels quels : get() renvoie
+    l'instance stockée, les mutations sont visibles immédiatement.
+    """
+
+    def __init__(self, kind: str, record_cls):
+        self.kind = kind
+        self.record_cls = record_cls
+        self._cache = TTLCache(ttl_seconds=GAME_STATE_TTL_SECONDS, max_size=GAME_STATE_MAX_ENTRIES)
+        self._writes = 0
+
+    async def get(self, game_id: str):
+        return self._cache.get(game_id)
+
+    async def save(self, game_id: str, state) -> bool:
+        ttl = GAME_STATE_FINISHED_TTL_SECONDS if state.finished else GAME_STATE_TTL_SECONDS
+        state.version += 1
+        self._cache.set(game_id, state, ttl_seconds=ttl)
+
+        self._writes += 1
+        if self._writes % GAME_STATE_PURGE_EVERY == 0:
+            self._cache.purge_expired()
+        return True
+
+    async def delete(self, game_id: str) -> None:
+        self._cache.invalidate(game_id)
+
+    def stats(self) -> dict:
+        return {"backend": "memory", "kind": self.kind, **self._cache.stats()}
+
+
+# =========================================================
+# BACKEND POSTGRES
+# =========================================================
+
+class PostgresGameStore:
+    """
+    Store partagé (table game_states). Chaque save() est conditionnel
+    à la version lue : deux workers ne peuvent pas valider la même partie.
+    """
+
+    def __init__(self, kind: str, record_cls):
+        self.kind = kind
+        self.record_cls = record_cls
+        self._writes = 0
+        self.hits = 0
+        self.misses = 0
+        self.conflicts = 0
+
+    def _key(self, game_id: str) -> str:
+        return f"{self.kind}:{game_id}"
+
+    async def get(self, game_id: str):
+        async with AsyncSessionLocal() as session:
+            row = (
+                await session.execute(
+                    select(GameState.payload, GameState.version).where(
+                        GameState.key == self._key(game_id),
+                        GameState.expires_at > datetime.utcnow(),
+                    )
+                )
+            ).first()
+
+        if row is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return self.record_cls.from_dict(row.payload, version=row.version)
+
+    async def save(self, game_id: str, state) -> bool:
+        """Retourne False si la partie a été modifiée entre-temps (autre worker)."""
+        ttl = GAME_STATE_FINISHED_TTL_SECONDS if state.finished else GAME_STATE_TTL_SECONDS
+        expires_at = datetime.utcnow() + timedelta(seconds=ttl)
+        payload = state.to_dict()
+
+        async with AsyncSessionLocal() as session:
+            if state.version == 0:
+                stmt = (
+                    insert(GameState)
+                    .values(
+                        key=self._key(game_id),
+                        kind=self.kind,
+                        user_id=state.user_id,
+                        payload=payload,
+                        version=1,
+                        expires_at=expires_at,
+                    )
+                    .on_conflict_do_nothing(index_elements=[GameState.key])
+                    .returning(GameState.version)
+                )
+            else:
+                stmt = (
+                    update(GameState)
+                    .where(
+                        GameState.key == self._key(game_id),
+                        GameState.version == state.version,
+                    )
+                    .values(
+                        payload=payload,
+                        version=GameState.version + 1,
+                        expires_at=expires_at,
+                    )
+                    .returning(GameState.version)
+                )
+
+            new_version = (await session.execute(stmt)).scalar_one_or_none()
+
+            self._writes += 1
+            if self._writes % GAME_STATE_PURGE_EVERY == 0:
+                await session.execute(
+                    delete(GameState).where(GameState.expires_at <= datetime.utcnow())
+                )
+
+            await session.commit()
+
+        if new_version is None:
+            self.conflicts += 1
+            return False
+
+        state.version = new_version
+        return True
+
+    async def delete(self, game_id: str) -> None:
+        async with AsyncSessionLocal() as session:
+            await session.execute(delete(GameState).where(GameState.key == self._key(game_id)))
+            await session.commit()
+
+    def stats(self) -> dict:
+        return {
+            "backend": "postgres",
+            "kind": self.kind,
+            "hits": self.hits,
+            "misses": self.misses,
+            "conflicts": self.conflicts,
+            "ttl_seconds": GAME_STATE_TTL_SECONDS,
+        }
+
+
+def _make_store(kind: str, record_cls):
+    if GAME_STATE_BACKEND == "postgres":
+        return PostgresGameStore(kind, record_cls)
+    if GAME_STATE_BACKEND != "memory":
+        logger.warning(f"[game_store] Backend inconnu '{GAME_STATE_BACKEND}', utilisation de 'memory'.")
+    return MemoryGameStore(kind, record_cls)
+
+
+lucky_games = _make_store("lucky", LuckyGameState)
+trade_games = _make_store("trade", TradeGameState)
+
+
+def game_store_stats() -> dict:
+    return {"luckygame": lucky_games.stats(), "tradegame": trade_games.stats()}
+
+
+# =========================================================
+# MÉTRIQUES (/metrics)
+# =========================================================
+
+def _per_store(field: str):
+    """{(kind,): valeur} pour les stores qui exposent `field` (memory ou postgres)."""
+    def read() -> dict:
+        values = {}
+        for store in (lucky_games, trade_games):
+            stats = store.stats()
+            if field in stats:
+                values[(store.kind,)] = stats[field]
+        return values
+    return read
+
+
+gauge("game_store_entries", "Parties en mémoire dans ce process.", _per_store("size"), ("kind",))
+counter("game_store_evictions_total", "Parties évincées par le plafond LRU (GAME_STATE_MAX_ENTRIES).",
+        ("kind",), _per_store("evictions"))
+counter("game_store_expirations_total", "Parties expirées (TTL).", ("kind",), _per_store("expirations"))
+counter("game_store_conflicts_total", "Sauvegardes refusées : partie modifiée par un autre worker.",
+        ("kind",), _per_store("conflicts"))
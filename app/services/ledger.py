@@ -0,0 +1,202 @@
+# app/services/ledger.py
+
+# Primitives comptables atomiques (une seule requête par opération) :
+# - crédit = INSERT ... ON CONFLICT DO UPDATE ... RETURNING
+# - débit  = UPDATE ... WHERE solde >= montant RETURNING
+# ⚠️ Aucune fonction ne fait de commit : la transaction appartient à l'appelant.
+# Chaque mouvement est aussi journalisé (ledger_journal, écrit au commit).
+
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Optional, Sequence
+
+from sqlalchemy import case, func, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import Balance, Bonus, BonusStatus, MiningDailyRollup, RealCash, UserMiningStats
+from app.services.ledger_journal import (
+    ACCOUNT_BALANCE, ACCOUNT_BONUS, ACCOUNT_REAL_CASH, record_entry,
+)
+from app.services.progression import Ladder
+from app.utils.read_pins import mark_user_written
+
+
+# =========================================================
+# BALANCE (points)
+# =========================================================
+
+async def upsert_balance(
+    db: AsyncSession, user_id: int, points: int, entry_type: str = "credit", reference: Optional[str] = None
+) -> int:
+    """Ajoute `points` à la balance (création si absente). Retourne le nouveau total."""
+    stmt = insert(Balance).values(user_id=user_id, points=int(points))
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[Balance.user_id],
+        set_={
+            "points": Balance.points + stmt.excluded.points,
+            "last_updated": func.now(),
+        },
+    ).returning(Balance.points)
+
+    new_total = (await db.execute(stmt)).scalar_one()
+    record_entry(db, ACCOUNT_BALANCE, user_id, int(points), entry_type, reference)
+    return new_total
+
+
+async def debit_balance_if_sufficient(
+    db: AsyncSession, user_id: int, points: int, entry_type: str = "debit", reference: Optional[str] = None
+) -> Optional[int]:
+    """Retire `points` si le solde suffit. Retourne le nouveau total, ou None."""
+    result = await db.execute(
+        update(Balance)
+        .where(Balance.user_id == user_id, Balance.points >= int(points))
+        .values(points=Balance.points - int(points), last_updated=func.now())
+        .returning(Balance.points)
+        .execution_options(synchronize_session=False)
+    )
+    new_total = result.scalar_one_or_none()
+    if new_total is not None:
+        record_entry(db, ACCOUNT_BALANCE, user_id, -int(points), entry_type, reference)
+    return new_total
+
+
+# =========================================================
+# BONUS
+# =========================================================
+
+async def upsert_bonus_points(
+    db: AsyncSession, user_id: int, amount: Decimal, entry_type: str = "credit", reference: Optional[str] = None
+) -> Decimal:
+    """Ajoute `amount` aux points bonus restants. Retourne le nouveau reste."""
+    stmt = insert(Bonus).values(
+        user_id=user_id,
+        points_restants=amount,
+        valeur_equivalente=Decimal("0"),
+        status=BonusStatus.en_attente,
+        cree_le=datetime.utcnow(),
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[Bonus.user_id],
+        set_={
+            "points_restants": func.coalesce(Bonus.points_restants, 0) + stmt.excluded.points_restants,
+        },
+    ).returning(Bonus.points_restants)
+
+    remaining = (await db.execute(stmt)).scalar_one()
+    record_entry(db, ACCOUNT_BONUS, user_id, amount, entry_type, reference)
+    return remaining
+
+
+# =========================================================
+# REAL CASH
+# =========================================================
+
+async def upsert_real_cash(
+    db: AsyncSession, user_id: int, amount: Decimal, entry_type: str = "credit", reference: Optional[str] = None
+) -> RealCash:
+    """Crédite le compte real_cash (création si absent). Retourne la ligne à jour."""
+    stmt = insert(RealCash).values(user_id=user_id, cash_balance=amount)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[RealCash.user_id],
+        set_={
+            "cash_balance": RealCash.cash_balance + stmt.excluded.cash_balance,
+            "updated_at": func.now(),
+        },
+    ).returning(RealCash)
+
+    result = await db.execute(stmt, execution_options={"populate_existing": True})
+    real_cash = result.scalars().one()
+    record_entry(db, ACCOUNT_REAL_CASH, user_id, amount, entry_type, reference)
+    return real_cash
+
+
+async def debit_real_cash_if_sufficient(
+    db: AsyncSession, user_id: int, amount: Decimal, entry_type: str = "debit", reference: Optional[str] = None
+) -> Optional[RealCash]:
+    """Débite le compte real_cash si le solde suffit. Retourne la ligne, ou None."""
+    result = await db.execute(
+        update(RealCash)
+        .where(RealCash.user_id == user_id, RealCash.cash_balance >= amount)
+        .values(cash_balance=RealCash.cash_balance - amount, updated_at=func.now())
+        .returning(RealCash),
+        execution_options={"populate_existing": True, "synchronize_session": False},
+    )
+    real_cash = result.scalars().first()
+    if real_cash is not None:
+        record_entry(db, ACCOUNT_REAL_CASH, user_id, -amount, entry_type, reference)
+    return real_cash
+
+
+# =========================================================
+# MINING STATS
+# =========================================================
+
+def _level_case(total_expr, thresholds: Sequence[int]):
+    """Traduit les paliers en CASE SQL (du plus haut au plus bas)."""
+    whens = [
+        (total_expr >= threshold, level)
+        for level, threshold in reversed(list(enumerate(thresholds, start=1)))
+    ]
+    return case(*whens, else_=1)
+
+
+async def upsert_mining_stats(
+    db: AsyncSession,
+    user_id: int,
+    points: int,
+    ladder: Ladder,
+) -> tuple[int, int]:
+    """
+    Ajoute `points` au total miné et recalcule le niveau dans la même requête.
+    Retourne (total_mined, level).
+    """
+    stmt = insert(UserMiningStats).values(
+        user_id=user_id,
+        total_mined=int(points),
+        level=ladder.level_for(int(points)),
+    )
+    new_total = UserMiningStats.total_mined + stmt.excluded.total_mined
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[UserMiningStats.user_id],
+        set_={
+            "total_mined": new_total,
+            "level": _level_case(new_total, ladder.thresholds),
+            "updated_at": func.now(),
+        },
+    ).returning(UserMiningStats.total_mined, UserMiningStats.level)
+
+    row = (await db.execute(stmt)).one()
+    mark_user_written(db, user_id)
+    return int(row.total_mined), int(row.level)
+
+
+# Source des lignes MiningHistory sans source
+ROLLUP_UNKNOWN_SOURCE = "unknown"
+
+
+async def upsert_mining_rollup(
+    db: AsyncSession,
+    user_id: int,
+    day: date,
+    source: Optional[str],
+    points: int,
+) -> None:
+    """Ajoute une entrée au cumul journalier (user_id, jour, source)."""
+    stmt = insert(MiningDailyRollup).values(
+        user_id=user_id,
+        day=day,
+        source=source or ROLLUP_UNKNOWN_SOURCE,
+        total_points=int(points),
+        entries=1,
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[MiningDailyRollup.user_id, MiningDailyRollup.day, MiningDailyRollup.source],
+        set_={
+            "total_points": MiningDailyRollup.total_points + stmt.excluded.total_points,
+            "entries": MiningDailyRollup.entries + 1,
+            "updated_at": func.now(),
+        },
+    )
+    await db.execute(stmt)
+    mark_user_written(db, user_id)
@@ -0,0 +1,133 @@
+# app/services/ledger_journal.py
+
+# Journal d'audit append-only des mouvements de comptes :
+# - record_entry() met l'entrée en tampon dans la session (aucune requête)
+# - au commit, tout le tampon part en un seul INSERT multi-lignes
+# - rollback : le tampon est vidé, rien n'est écrit
+# Les colonnes Balance/Wallet/RealCash/Bonus restent la source de vérité
+# (lectures et écritures) : le journal ne réduit pas la contention sur ces
+# lignes, il ajoute un INSERT groupé par commit.
+# Les snapshots de compaction sont des points de contrôle d'audit :
+# snapshot + entrées suivantes doit égaler la colonne du compte.
+
+import os
+from datetime import datetime, timedelta
+from decimal import Decimal
+from typing import Optional
+
+from sqlalchemy import DateTime, event, func, insert, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.database import AsyncSessionLocal
+from app.models import LedgerEntry
+from app.utils.read_pins import mark_user_written
+
+_BUFFER_KEY = "ledger_buffer"
+
+# Comptes
+ACCOUNT_BALANCE = "balance"
+ACCOUNT_WALLET = "wallet"
+ACCOUNT_REAL_CASH = "real_cash"
+ACCOUNT_BONUS = "bonus"
+
+# ⏱️ Les entrées insérées depuis moins de ce délai ne sont pas compactées.
+# Doit dépasser la plus longue transaction : un id attribué avant le filigrane
+# doit être commité quand la compaction le dépasse.
+LEDGER_COMPACTION_GRACE_SECONDS = float(os.getenv("LEDGER_COMPACTION_GRACE_SECONDS", 300))
+
+
+def record_entry(
+    db: AsyncSession,
+    account: str,
+    user_id: int,
+    delta,
+    entry_type: str,
+    reference: Optional[str] = None,
+) -> None:
+    """
+    Ajoute une entrée au tampon de la transaction en cours (écrite au commit).
+    L'utilisateur est épinglé au primaire après le commit (lecture de ses écritures).
+    """
+    mark_user_written(db, user_id)
+    db.info.setdefault(_BUFFER_KEY, []).append({
+        "account": account,
+        "user_id": user_id,
+        "entry_type": entry_type,
+        "delta": Decimal(str(delta)),
+        "reference": reference,
+        "created_at": datetime.utcnow(),
+    })
+
+
+# =========================================================
+# ÉCRITURE GROUPÉE AU COMMIT
+# =========================================================
+
+@event.listens_for(Session, "before_commit")
+def _flush_ledger_buffer(session: Session):
+    rows = session.info.pop(_BUFFER_KEY, None)
+    if rows:
+        session.execute(insert(LedgerEntry), rows)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_ledger_buffer(session: Session, previous_transaction):
+    session.info.pop(_BUFFER_KEY, None)
+
+
+# =========================================================
+# COMPACTION
+# =========================================================
+
+_COMPACT_SQL = text(
+    """
+    INSERT INTO ledger_snapshots (account, user_id, amount, last_entry_id, updated_at)
+    SELECT e.account,
+           e.user_id,
+           COALESCE(MAX(s.amount), 0) + SUM(e.delta),
+           MAX(e.id),
+           now()
+    FROM ledger_entries e
+    LEFT JOIN ledger_snapshots s
+           ON s.account = e.account AND s.user_id = e.user_id
+    WHERE e.id <= :max_id
+      AND e.id > COALESCE(s.last_entry_id, 0)
+    GROUP BY e.account, e.user_id
+    ON CONFLICT (account, user_id) DO UPDATE
+    SET amount = EXCLUDED.amount,
+        last_entry_id = EXCLUDED.last_entry_id,
+        updated_at = now()
+    """
+)
+
+
+async def compact_ledger_snapshots(db: AsyncSession) -> int:
+    """
+    Avance les snapshots jusqu'à la dernière entrée assez ancienne.
+    Le journal n'est pas supprimé (audit). Ne fait PAS de commit.
+    Retourne le nombre de comptes mis à jour.
+
+    Filigrane sur inserted_at (horloge de la base au moment de l'INSERT, comme
+    l'attribution des ids) et non sur created_at (horloge Python au record_entry).
+    """
+    cutoff = func.clock_timestamp(type_=DateTime) - timedelta(seconds=LEDGER_COMPACTION_GRACE_SECONDS)
+    max_id = (
+        await db.execute(
+            select(func.max(LedgerEntry.id)).where(LedgerEntry.inserted_at < cutoff)
+        )
+    ).scalar()
+
+    if max_id is None:
+        return 0
+
+    result = await db.execute(_COMPACT_SQL, {"max_id": max_id})
+    return result.rowcount
+
+
+async def run_ledger_compaction() -> None:
+    """Job planifié (leader) : compaction dans sa propre transaction."""
+    async with AsyncSessionLocal() as db:
+        updated = await compact_ledger_snapshots(db)
+        await db.commit()
+    print(f"🧾 Compaction du journal : {updated} snapshots mis à jour.")
@@ -0,0 +1,163 @@
+# app/services/mining_events.py
+
+# Statut du minage en push (SSE) :
+# - l'état est lu une fois à la connexion, puis seules les transitions sont émises
+#   (running -> ready_to_claim -> claimed)
+# - running -> ready_to_claim est déclenché par une roue de timers en mémoire
+#   (tas trié par MineTimer.end_time) : aucun client inactif ne coûte de requête
+# ⚠️ Par process : les transitions start/claim publiées sur un autre worker
+# ne sont pas vues ici (la roue de timers, elle, fonctionne partout).
+
+import asyncio
+import heapq
+import logging
+import os
+from datetime import datetime
+from typing import Dict, Hashable, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+# Transitions en attente max par client
+MINING_EVENTS_QUEUE_SIZE = int(os.getenv("MINING_EVENTS_QUEUE_SIZE", 8))
+
+
+# =========================================================
+# ROUE DE TIMERS
+# =========================================================
+
+class TimerWheel:
+    """Une seule tâche asyncio qui dort jusqu'à la prochaine échéance."""
+
+    def __init__(self, on_due):
+        self._on_due = on_due
+        self._heap: list = []
+        self._scheduled: set = set()
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    def schedule(self, when: datetime, key: Hashable):
+        # une seule entrée par échéance, même après reconnexions
+        if (when, key) in self._scheduled:
+            return
+        self._scheduled.add((when, key))
+        heapq.heappush(self._heap, (when, key))
+        self._wakeup.set()
+
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    async def _run(self):
+        while self._heap:
+            self._wakeup.clear()
+            when, key = self._heap[0]
+            delay = (when - datetime.utcnow()).total_seconds()
+
+            if delay > 0:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue  # une échéance plus proche a pu être ajoutée
+
+            heapq.heappop(self._heap)
+            self._scheduled.discard((when, key))
+            try:
+                self._on_due(key, when)
+            except Exception as e:
+                logger.error(f"[mining_events] Erreur sur l'échéance {key} : {e}")
+
+
+# =========================================================
+# HUB DES STATUTS
+# =========================================================
+
+def render_status(state: dict, now: Optional[datetime] = None) -> dict:
+    """Même forme que GET /mining/status/{user_id}, plus l'échéance."""
+    now = now or datetime.utcnow()
+    payload = {
+        "status": state["status"],
+        "level": state["level"],
+        "total_mined": state["total_mined"],
+    }
+
+    if state["status"] == "running":
+        remaining = state["end_time"] - now
+        payload["remaining_time_ms"] = max(0, int(remaining.total_seconds() * 1000))
+        payload["total_cycle_ms"] = state["total_cycle_ms"]
+        payload["expires_at"] = state["end_time"].isoformat()
+
+    return payload
+
+
+class MiningStatusHub:
+    """Abonnés SSE par utilisateur + dernier état connu de chacun."""
+
+    def __init__(self):
+        self._subscribers: Dict[int, Set[asyncio.Queue]] = {}
+        self._states: Dict[int, dict] = {}
+        self._wheel = TimerWheel(self._on_timer_due)
+
+    def subscribe(self, user_id: int, state: dict) -> asyncio.Queue:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=MINING_EVENTS_QUEUE_SIZE)
+        self._subscribers.setdefault(user_id, set()).add(queue)
+
+        # l'état lu en base à la connexion fait foi
+        self._set_state(user_id, state)
+        queue.put_nowait(state)
+        return queue
+
+    def unsubscribe(self, user_id: int, queue: asyncio.Queue):
+        queues = self._subscribers.get(user_id)
+        if queues is None:
+            return
+        queues.discard(queue)
+        if not queues:
+            del self._subscribers[user_id]
+            self._states.pop(user_id, None)
+
+    def is_watched(self, user_id: int) -> bool:
+        return user_id in self._subscribers
+
+    def publish(self, user_id: int, state: dict):
+        """Transition (start / claim) : no-op si personne n'écoute cet utilisateur."""
+        if user_id not in self._subscribers:
+            return
+        self._set_state(user_id, state)
+        self._broadcast(user_id, state)
+
+    def _set_state(self, user_id: int, state: dict):
+        self._states[user_id] = state
+        if state["status"] == "running":
+            self._wheel.schedule(state["end_time"], user_id)
+
+    def _broadcast(self, user_id: int, state: dict):
+        for queue in list(self._subscribers.get(user_id, ())):
+            try:
+                queue.put_nowait(state)
+            except asyncio.QueueFull:
+                # client bloqué : on garde seulement le dernier état
+                queue.get_nowait()
+                queue.put_nowait(state)
+
+    def _on_timer_due(self, user_id: int, end_time: datetime):
+        state = self._states.get(user_id)
+        # échéance périmée (nouveau cycle, claim, déconnexion)
+        if not state or state["status"] != "running" or state["end_time"] != end_time:
+            return
+
+        ready = {**state, "status": "ready_to_claim"}
+        self._states[user_id] = ready
+        self._broadcast(user_id, ready)
+
+    def stats(self) -> dict:
+        return {
+            "users": len(self._subscribers),
+            "subscribers": sum(len(q) for q in self._subscribers.values()),
+            "pending_timers": len(self._wheel),
+        }
+
+
+mining_status_hub = MiningStatusHub()
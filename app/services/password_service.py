@@ -0,0 +1,92 @@
+# app/services/password_service.py
+
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from fastapi import HTTPException, status
+from passlib.context import CryptContext
+
+from app.utils.metrics import counter, gauge
+
+# Contexte pour le hachage des mots de passe
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+# ⚙️ Pool dédié : bcrypt libère le GIL, des threads suffisent
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", 2))
+# Nombre max d'opérations en attente avant de refuser (admission control)
+PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", 32))
+
+_executor = ThreadPoolExecutor(
+    max_workers=PASSWORD_HASH_WORKERS,
+    thread_name_prefix="pwd-hash",
+)
+
+# 📊 Métriques (boucle asyncio uniquement → pas de verrou)
+_pending = 0
+_stats = {
+    "completed": 0,
+    "rejected": 0,
+    "max_pending_seen": 0,
+}
+
+
+def _in_flight() -> int:
+    """Opérations en cours sur un thread du pool."""
+    return min(_pending, PASSWORD_HASH_WORKERS)
+
+
+def _queue_depth() -> int:
+    """Opérations admises mais en attente d'un thread libre."""
+    return max(_pending - PASSWORD_HASH_WORKERS, 0)
+
+
+gauge("password_hash_in_flight", "Hachages/vérifications bcrypt en cours.", _in_flight)
+gauge("password_hash_queue_depth", "Hachages/vérifications bcrypt en attente d'un thread.", _queue_depth)
+password_hash_rejected = counter(
+    "password_hash_rejected_total", "Opérations refusées (503) au-delà de PASSWORD_HASH_MAX_PENDING."
+)
+
+
+async def _run(fn, *args):
+    global _pending
+
+    if _pending >= PASSWORD_HASH_MAX_PENDING:
+        _stats["rejected"] += 1
+        password_hash_rejected.inc()
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Serveur occupé, réessayez dans un instant.",
+            headers={"Retry-After": "1"},
+        )
+
+    _pending += 1
+    _stats["max_pending_seen"] = max(_stats["max_pending_seen"], _pending)
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_executor, fn, *args)
+    finally:
+        _pending -= 1
+        _stats["completed"] += 1
+
+
+async def hash_password(password: str) -> str:
+    """Hache un mot de passe hors de la boucle d'événements."""
+    return await _run(pwd_context.hash, password)
+
+
+async def verify_password(password: str, password_hash: str) -> bool:
+    """Vérifie un mot de passe hors de la boucle d'événements."""
+    return await _run(pwd_context.verify, password, password_hash)
+
+
+def password_pool_stats() -> dict:
+    """Profondeur de file et compteurs du pool de hachage."""
+    return {
+        "workers": PASSWORD_HASH_WORKERS,
+        "max_pending": PASSWORD_HASH_MAX_PENDING,
+        "pending": _pending,
+        "in_flight": _in_flight(),
+        "queue_depth": _queue_depth(),
+        **_stats,
+    }
@@ -0,0 +1,128 @@
+# app/services/progression.py
+
+# Moteur de niveaux unique (mining, minhistory, luckygame) :
+# - paliers triés, recherche par bisect (O(log n))
+# - métadonnées par niveau (palier suivant, amplitude) précalculées
+# - paliers configurables (fichier JSON) et rechargés à chaud sur changement de mtime
+#
+# Fichier PROGRESSION_CONFIG_FILE (optionnel) :
+#   {"mining": [0, 1000, 3000, ...], "luckygame_tier": [1, 6, 11, 16, 21]}
+
+import json
+import logging
+import os
+import time
+from bisect import bisect_right
+from typing import Dict, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+PROGRESSION_CONFIG_FILE = os.getenv("PROGRESSION_CONFIG_FILE")
+
+# Intervalle minimal entre deux vérifications du fichier
+PROGRESSION_RELOAD_SECONDS = float(os.getenv("PROGRESSION_RELOAD_SECONDS", 5))
+
+# 🎯 Paliers par défaut
+DEFAULT_LADDERS: Dict[str, list] = {
+    # points minés -> niveau (progressif)
+    "mining": [0, 1000, 3000, 6000, 10000, 15000, 25000, 40000, 60000],
+    # niveau luckygame -> tier (1-5, 6-10, 11-15, 16-20, 21+)
+    "luckygame_tier": [1, 6, 11, 16, 21],
+}
+
+
+class Ladder:
+    """Paliers croissants : niveau = nombre de paliers atteints (minimum 1)."""
+
+    __slots__ = ("name", "thresholds", "_next", "_span")
+
+    def __init__(self, name: str, thresholds: Sequence[int]):
+        thresholds = tuple(int(t) for t in thresholds)
+        if not thresholds:
+            raise ValueError(f"Ladder '{name}' : aucun palier.")
+        if any(b <= a for a, b in zip(thresholds, thresholds[1:])):
+            raise ValueError(f"Ladder '{name}' : paliers non strictement croissants.")
+
+        self.name = name
+        self.thresholds = thresholds
+
+        # index = niveau - 1
+        self._next = tuple(thresholds[1:]) + (None,)
+        self._span = tuple(
+            (nxt - cur) if nxt is not None else None
+            for cur, nxt in zip(thresholds, self._next)
+        )
+
+    @property
+    def max_level(self) -> int:
+        return len(self.thresholds)
+
+    def level_for(self, value: int) -> int:
+        return max(1, bisect_right(self.thresholds, value))
+
+    def next_threshold(self, level: int) -> Optional[int]:
+        return self._next[min(level, self.max_level) - 1]
+
+    def progress(self, value: int) -> dict:
+        level = self.level_for(value)
+        nxt = self._next[level - 1]
+        span = self._span[level - 1]
+
+        if nxt is None:
+            percent = 100.0
+        else:
+            percent = round(max(0, value - self.thresholds[level - 1]) * 100 / span, 2)
+
+        return {
+            "level": level,
+            "next_level_at": nxt,
+            "progress_percent": percent,
+        }
+
+
+# =========================================================
+# REGISTRE (rechargement à chaud)
+# =========================================================
+
+_ladders: Dict[str, Ladder] = {name: Ladder(name, t) for name, t in DEFAULT_LADDERS.items()}
+_config_mtime: Optional[float] = None
+_last_check: float = 0.0
+
+
+def _reload_if_changed() -> None:
+    global _ladders, _config_mtime, _last_check
+
+    if not PROGRESSION_CONFIG_FILE:
+        return
+
+    now = time.monotonic()
+    if now - _last_check < PROGRESSION_RELOAD_SECONDS:
+        return
+    _last_check = now
+
+    try:
+        mtime = os.stat(PROGRESSION_CONFIG_FILE).st_mtime
+    except OSError:
+        return
+
+    if mtime == _config_mtime:
+        return
+
+    try:
+        with open(PROGRESSION_CONFIG_FILE, encoding="utf-8") as f:
+            config = json.load(f)
+        ladders = {name: Ladder(name, t) for name, t in {**DEFAULT_LADDERS, **config}.items()}
+    except Exception as e:
+        # config invalide : on garde les paliers actuels
+        logger.error(f"[progression] Configuration invalide ({PROGRESSION_CONFIG_FILE}) : {e}")
+        _config_mtime = mtime
+        return
+
+    _ladders = ladders
+    _config_mtime = mtime
+    logger.info(f"[progression] Paliers rechargés depuis {PROGRESSION_CONFIG_FILE}.")
+
+
+def get_ladder(name: str) -> Ladder:
+    _reload_if_changed()
+    return _ladders[name]
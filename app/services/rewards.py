@@ -8,7 +8,7 @@ import logging
 
 from app.models import User, PromoCode, Friend
 from app.services.balance_service import credit_balance
-from app.services.bonus_service import add_bonus_points
+from app.services.bonus_service import add_bonus_points, invalidate_bonus_conditions_on_commit
 
 logger = logging.getLogger(__name__)
 
@@ -98,6 +98,7 @@ async def reward_referrer(
 
     # Synchroniser sans commit
     await db.flush()
+    invalidate_bonus_conditions_on_commit(db, referrer.id)
 
     logger.info(
         f"[rewards] {referrer.username} récompensé : "
@@ -4,6 +4,8 @@ from decimal import Decimal, ROUND_DOWN
 from sqlalchemy import select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.models import Wallet
+from app.services.bonus_service import invalidate_bonus_conditions_on_commit
+from app.services.ledger_journal import ACCOUNT_WALLET, record_entry
 
 
 TWOPLACES = Decimal("0.01")
@@ -49,6 +51,8 @@ async def credit_wallet(user, amount: Decimal, db: AsyncSession) -> Wallet:
         db.add(wallet)
         await db.flush()  # pour avoir l'objet synchronisé
 
+    record_entry(db, ACCOUNT_WALLET, user.id, amount, "credit")
+    invalidate_bonus_conditions_on_commit(db, user.id)
     return wallet
 
 
@@ -79,6 +83,8 @@ async def debit_wallet(user, amount: Decimal, db: AsyncSession) -> Wallet:
     if not wallet:
         raise ValueError("Solde insuffisant ou wallet inexistant.")
 
+    record_entry(db, ACCOUNT_WALLET, user.id, -amount, "debit")
+    invalidate_bonus_conditions_on_commit(db, user.id)
     return wallet
 
 
@@ -0,0 +1,240 @@
+# app/tasks/convert_bonus_daily.py
+import asyncio
+import os
+import time as time_module
+from datetime import datetime, timedelta, time
+from decimal import Decimal
+from typing import Optional
+
+from sqlalchemy import text, select, func
+
+from app.database import AsyncSessionLocal
+from app.models import Bonus
+from app.services.bonus_service import PACK_CONVERSION_RATES, DEFAULT_CONVERSION_RATE
+from app.tasks.reset_daily_tasks import BENIN_TZ
+from app.tasks.scheduler import run_as_leader
+from app.utils.read_pins import pin_user_reads
+
+
+# ⚙️ Taille des lots et pause entre deux lots
+CONVERSION_BATCH_SIZE = int(os.getenv("BONUS_CONVERSION_BATCH_SIZE", 1000))
+CONVERSION_BATCH_PAUSE_SECONDS = float(os.getenv("BONUS_CONVERSION_BATCH_PAUSE_SECONDS", 0.05))
+
+# 🕐 Heure locale d'exécution (après le reset de minuit)
+CONVERSION_HOUR = int(os.getenv("BONUS_CONVERSION_HOUR", 1))
+
+# Un bonus converti il y a moins de N heures est ignoré (relance le même jour = no-op)
+CONVERSION_MIN_INTERVAL_HOURS = float(os.getenv("BONUS_CONVERSION_MIN_INTERVAL_HOURS", 20))
+
+# 📊 Métriques du dernier passage
+last_run_stats: dict = {}
+
+
+# =========================
+# 🔹 SQL ensembliste (un lot = une requête)
+# =========================
+
+def _rates_values() -> tuple[str, dict]:
+    """Table des taux en VALUES (paramètres liés)."""
+    rows, params = [], {}
+    for i, (name, rate) in enumerate(PACK_CONVERSION_RATES.items()):
+        rows.append(f"(:rate_name_{i}, CAST(:rate_{i} AS numeric))")
+        params[f"rate_name_{i}"] = name
+        params[f"rate_{i}"] = rate
+    return ", ".join(rows), params
+
+
+_BATCH_CTE = """
+WITH rates(name, taux) AS (VALUES {rates}),
+batch AS (
+    SELECT b.id, b.user_id, b.points_restants
+    FROM bonus b
+    WHERE b.id > :after_id
+      AND b.id <= :max_id
+      AND b.status IN ('eligible', 'en_conversion')
+      AND b.points_restants > 0
+      AND (b.converti_le IS NULL OR b.converti_le < :cutoff)
+    ORDER BY b.id
+    LIMIT :batch_size
+),
+packs AS (
+    -- premier pack finance de chaque utilisateur du lot
+    SELECT DISTINCT ON (ua.user_id) ua.user_id, a.name
+    FROM user_actions ua
+    JOIN actions a ON a.id = ua.action_id
+    WHERE a.category = 'finance'
+      AND ua.user_id IN (SELECT user_id FROM batch)
+    ORDER BY ua.user_id, ua.id
+),
+calc AS (
+    SELECT batch.id,
+           batch.user_id,
+           ROUND(batch.points_restants * COALESCE(r.taux, CAST(:default_rate AS numeric)), 2) AS montant
+    FROM batch
+    JOIN packs p ON p.user_id = batch.user_id
+    JOIN wallet w ON w.user_id = batch.user_id
+    LEFT JOIN rates r ON r.name = p.name
+)
+"""
+
+_APPLY = """
+, upd_bonus AS (
+    UPDATE bonus b
+    SET points_restants = b.points_restants - calc.montant,
+        valeur_equivalente = COALESCE(b.valeur_equivalente, 0) + calc.montant,
+        status = CASE
+            WHEN b.points_restants - calc.montant <= 0 THEN CAST('converti' AS bonusstatus)
+            ELSE CAST('en_conversion' AS bonusstatus)
+        END,
+        converti_le = :now
+    FROM calc
+    WHERE b.id = calc.id AND calc.montant > 0
+    RETURNING b.user_id, calc.montant
+),
+upd_wallet AS (
+    UPDATE wallet w
+    SET amount = w.amount + upd_bonus.montant,
+        last_updated = :now
+    FROM upd_bonus
+    WHERE w.user_id = upd_bonus.user_id
+    RETURNING w.user_id
+),
+ins_ledger AS (
+    -- journal : débit bonus + crédit wallet
+    INSERT INTO ledger_entries (account, user_id, entry_type, delta, created_at)
+    SELECT 'bonus', user_id, 'bonus_conversion', -montant, :now FROM upd_bonus
+    UNION ALL
+    SELECT 'wallet', user_id, 'bonus_conversion', montant, :now FROM upd_bonus
+)
+SELECT (SELECT MAX(id) FROM batch) AS last_id,
+       (SELECT COUNT(*) FROM batch) AS scanned,
+       (SELECT COUNT(*) FROM upd_wallet) AS converted,
+       (SELECT COALESCE(SUM(montant), 0) FROM upd_bonus) AS amount,
+       (SELECT array_agg(user_id) FROM upd_wallet) AS user_ids
+"""
+
+_DRY_RUN = """
+SELECT (SELECT MAX(id) FROM batch) AS last_id,
+       (SELECT COUNT(*) FROM batch) AS scanned,
+       (SELECT COUNT(*) FROM calc WHERE montant > 0) AS converted,
+       (SELECT COALESCE(SUM(montant), 0) FROM calc WHERE montant > 0) AS amount
+"""
+
+
+def _batch_statement(dry_run: bool):
+    rates, params = _rates_values()
+    sql = _BATCH_CTE.format(rates=rates) + (_DRY_RUN if dry_run else _APPLY)
+    return text(sql), params
+
+
+# =========================
+# 🔹 Conversion de tous les bonus éligibles
+# =========================
+async def convert_all_bonuses(dry_run: bool = False, now: Optional[datetime] = None) -> dict:
+    """
+    Convertit le bonus du jour de tous les utilisateurs éligibles, par lots.
+    Chaque lot : une seule requête (bonus + wallet), un commit.
+    En dry_run, rien n'est écrit : seules les métriques sont calculées.
+    """
+    global last_run_stats
+
+    now = now or datetime.utcnow()
+    cutoff = now - timedelta(hours=CONVERSION_MIN_INTERVAL_HOURS)
+    started = time_module.monotonic()
+
+    stmt, rate_params = _batch_statement(dry_run)
+    stats = {
+        "dry_run": dry_run,
+        "started_at": now.isoformat(),
+        "batches": 0,
+        "scanned": 0,
+        "converted": 0,
+        "amount": Decimal("0"),
+    }
+
+    async with AsyncSessionLocal() as db:
+        # bornes figées au départ : les nouveaux bonus attendront demain
+        max_id = (await db.execute(select(func.max(Bonus.id)))).scalar() or 0
+        after_id = 0
+
+        while after_id < max_id:
+            row = (
+                await db.execute(
+                    stmt,
+                    {
+                        **rate_params,
+                        "after_id": after_id,
+                        "max_id": max_id,
+                        "cutoff": cutoff,
+                        "batch_size": CONVERSION_BATCH_SIZE,
+                        "default_rate": DEFAULT_CONVERSION_RATE,
+                        "now": now,
+                    },
+                )
+            ).one()
+
+            if dry_run:
+                await db.rollback()
+            else:
+                await db.commit()
+                # lecture de ses écritures (pins de ce worker uniquement)
+                for user_id in row.user_ids or ():
+                    pin_user_reads(user_id)
+
+            if row.last_id is None:
+                break
+
+            after_id = row.last_id
+            stats["batches"] += 1
+            stats["scanned"] += row.scanned
+            stats["converted"] += row.converted
+            stats["amount"] += row.amount
+
+            await asyncio.sleep(CONVERSION_BATCH_PAUSE_SECONDS)
+
+    duration = time_module.monotonic() - started
+    stats["duration_seconds"] = round(duration, 3)
+    stats["converted_per_second"] = round(stats["converted"] / duration, 1) if duration > 0 else None
+    stats["amount"] = str(stats["amount"])
+
+    last_run_stats = stats
+    print(
+        f"💱 Conversion bonus{' (dry-run)' if dry_run else ''} : "
+        f"{stats['converted']} bonus convertis / {stats['scanned']} parcourus, "
+        f"{stats['amount']} BKC, {stats['batches']} lots en {stats['duration_seconds']}s."
+    )
+    return stats
+
+
+async def _run_conversion():
+    await convert_all_bonuses()
+
+
+async def start_daily_bonus_conversion_task():
+    """
+    Boucle planifiée : conversion des bonus chaque jour à CONVERSION_HOUR (heure locale du Bénin)
+    """
+    print(f"🕒 Démarrage du service de conversion des bonus ({CONVERSION_HOUR:02d}h00 heure locale du Bénin).")
+
+    while True:
+        now_local = datetime.now(BENIN_TZ)
+
+        next_run_local = BENIN_TZ.localize(datetime.combine(now_local.date(), time(CONVERSION_HOUR, 0)))
+        if next_run_local <= now_local:
+            next_run_local = BENIN_TZ.localize(
+                datetime.combine(now_local.date() + timedelta(days=1), time(CONVERSION_HOUR, 0))
+            )
+
+        await asyncio.sleep((next_run_local - now_local).total_seconds())
+
+        # un seul worker : le leader
+        await run_as_leader("bonus_conversion", _run_conversion)
+
+
+# =========================
+# 🔹 Permet de tester la conversion immédiatement
+# =========================
+if __name__ == "__main__":
+    import sys
+    print("⚡ Test de la conversion immédiate...")
+    asyncio.run(convert_all_bonuses(dry_run="--dry-run" in sys.argv))
@@ -1,43 +1,169 @@
 # app/tasks/reset_daily_tasks.py
 import asyncio
+import os
 from datetime import datetime, timedelta, time
 import pytz
-from sqlalchemy import delete, update
+from sqlalchemy import delete, update, select, func, or_
 from app.database import AsyncSessionLocal
 from app.models import UserPack, UserDailyTask
+from app.services.ledger_journal import run_ledger_compaction
+from app.tasks.scheduler import run_as_leader
+from app.utils.read_pins import mark_user_written
 
 BENIN_TZ = pytz.timezone("Africa/Porto-Novo")
 
 
+# ⚙️ Taille des lots et pause entre deux lots (évite le pic de minuit)
+RESET_BATCH_SIZE = int(os.getenv("DAILY_RESET_BATCH_SIZE", 1000))
+RESET_BATCH_PAUSE_SECONDS = float(os.getenv("DAILY_RESET_BATCH_PAUSE_SECONDS", 0.05))
+
+
+def _pack_needs_reset():
+    """Packs qui ne sont pas déjà dans l'état initial (évite de réécrire les autres)."""
+    return or_(
+        UserPack.start_date.isnot(None),
+        UserPack.last_claim_date.isnot(None),
+        UserPack.current_day.isnot(None),
+        UserPack.all_tasks_completed == True,
+        UserPack.is_unlocked == True,
+        UserPack.total_earned.is_distinct_from(0),
+        UserPack.pack_status.is_distinct_from("payé"),
+    )
+
+
+def _started_before(started_at: datetime):
+    # un pack démarré après le début du rollover appartient au nouveau jour
+    return or_(UserPack.start_date.is_(None), UserPack.start_date < started_at)
+
+
+async def _delete_orphan_tasks_batch(db, after_id: int, max_id: int):
+    """Supprime un lot de user_daily_tasks sans pack (pagination par id). Retourne le dernier id traité."""
+    ids = (
+        await db.execute(
+            select(UserDailyTask.id)
+            .where(
+                UserDailyTask.id > after_id,
+                UserDailyTask.id <= max_id,
+                UserDailyTask.user_pack_id.is_(None),
+            )
+            .order_by(UserDailyTask.id)
+            .limit(RESET_BATCH_SIZE)
+        )
+    ).scalars().all()
+
+    if not ids:
+        return None, 0
+
+    await db.execute(delete(UserDailyTask).where(UserDailyTask.id.in_(ids)))
+    return ids[-1], len(ids)
+
+
+async def _reset_packs_batch(db, after_id: int, max_id: int, started_at: datetime):
+    """
+    Réinitialise un lot de user_packs ET supprime leurs tâches du jour, dans la
+    même transaction : un pack n'est jamais vu sans tâches avec l'état d'hier,
+    et les tâches régénérées pendant le rollover sont supprimées avec leur pack.
+    Retourne (dernier id parcouru, packs réinitialisés, tâches supprimées).
+    """
+    last_id = (
+        await db.execute(
+            select(func.max(UserPack.id)).select_from(
+                select(UserPack.id)
+                .where(UserPack.id > after_id, UserPack.id <= max_id)
+                .order_by(UserPack.id)
+                .limit(RESET_BATCH_SIZE)
+                .subquery()
+            )
+        )
+    ).scalar()
+
+    if last_id is None:
+        return None, 0, 0
+
+    deleted = await db.execute(
+        delete(UserDailyTask)
+        .where(
+            UserDailyTask.user_pack_id.in_(
+                select(UserPack.id).where(
+                    UserPack.id > after_id,
+                    UserPack.id <= last_id,
+                    _started_before(started_at),
+                )
+            )
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+    result = await db.execute(
+        update(UserPack)
+        .where(
+            UserPack.id > after_id,
+            UserPack.id <= last_id,
+            _pack_needs_reset(),
+            _started_before(started_at),
+        )
+        .values(
+            all_tasks_completed=False,
+            current_day=None,
+            last_claim_date=None,
+            total_earned=0,
+            pack_status="payé",
+            is_unlocked=False,
+            start_date=None  # ✅ Important pour que le bouton Start apparaisse
+        )
+        .returning(UserPack.user_id)
+        .execution_options(synchronize_session=False)
+    )
+    user_ids = result.scalars().all()
+
+    # lecture de ses écritures : épinglés au primaire après le commit du lot
+    for user_id in user_ids:
+        mark_user_written(db, user_id)
+
+    return last_id, len(user_ids), deleted.rowcount
+
+
 async def reset_all_daily_tasks():
     """
-    Réinitialise toutes les tâches quotidiennes et les packs utilisateurs.
+    Réinitialise toutes les tâches quotidiennes et les packs utilisateurs,
+    par lots de packs (une transaction courte par lot : tâches + pack ensemble)
+    au lieu d'une transaction unique sur toute la table.
     """
     print("♻️ Réinitialisation des tâches quotidiennes...")
+    started_at = datetime.utcnow()
+
     async with AsyncSessionLocal() as db:
         try:
-            # 1️⃣ Supprimer toutes les tâches journalières
-            await db.execute(delete(UserDailyTask))
-            print("🧹 Table user_daily_tasks vidée.")
-
-            # 2️⃣ Réinitialiser les statuts des packs utilisateurs
-            await db.execute(
-                update(UserPack)
-                .values(
-                    all_tasks_completed=False,
-                    current_day=None,
-                    last_claim_date=None,
-                    total_earned=0,
-                    pack_status="payé",
-                    is_unlocked=False,
-                    start_date=None  # ✅ Important pour que le bouton Start apparaisse
-                )
-            )
-            print("🔁 Colonnes user_pack réinitialisées.")
-
-            # 3️⃣ Commit des changements
+            # Bornes figées au départ : les lignes créées pendant le rollover sont conservées
+            max_task_id = (await db.execute(select(func.max(UserDailyTask.id)))).scalar() or 0
+            max_pack_id = (await db.execute(select(func.max(UserPack.id)))).scalar() or 0
             await db.commit()
-            print("✅ Reset terminé avec succès.")
+
+            # 1️⃣ Packs + leurs tâches journalières, lot par lot
+            cursor, updated, deleted = 0, 0, 0
+            while True:
+                cursor, count, tasks_count = await _reset_packs_batch(db, cursor, max_pack_id, started_at)
+                if cursor is None:
+                    break
+                await db.commit()
+                updated += count
+                deleted += tasks_count
+                await asyncio.sleep(RESET_BATCH_PAUSE_SECONDS)
+            print(f"🔁 {updated} user_packs réinitialisés, {deleted} user_daily_tasks supprimées.")
+
+            # 2️⃣ Tâches journalières sans pack (anciennes lignes), lot par lot
+            cursor, orphans = 0, 0
+            while True:
+                cursor, count = await _delete_orphan_tasks_batch(db, cursor, max_task_id)
+                if cursor is None:
+                    break
+                await db.commit()
+                orphans += count
+                await asyncio.sleep(RESET_BATCH_PAUSE_SECONDS)
+            print(f"🧹 {orphans} user_daily_tasks sans pack supprimées.")
+
+            elapsed = (datetime.utcnow() - started_at).total_seconds()
+            print(f"✅ Reset terminé avec succès ({elapsed:.1f}s).")
 
         except Exception as e:
             await db.rollback()
@@ -69,14 +195,16 @@ async def start_daily_reset_task():
         # Attente jusqu’à minuit local
         await asyncio.sleep(wait_seconds)
 
-        # Exécution du reset
-        await reset_all_daily_tasks()
+        # Exécution du reset (un seul worker : le leader)
+        await run_as_leader("daily_reset", reset_all_daily_tasks)
+
+        # Compaction du journal comptable (snapshots)
+        await run_as_leader("ledger_compaction", run_ledger_compaction)
 
 
 # =========================
 # 🔹 Permet de tester le reset immédiatement
 # =========================
 if __name__ == "__main__":
-    import asyncio
     print("⚡ Test du reset immédiat...")
     asyncio.run(reset_all_daily_tasks())
\ No newline at end of file
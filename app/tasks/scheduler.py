@@ -0,0 +1,112 @@
+# app/tasks/scheduler.py
+import asyncio
+import logging
+import os
+import zlib
+from typing import Awaitable, Callable, Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from app.database import engine
+
+logger = logging.getLogger(__name__)
+
+# "postgres" (verrou consultatif) ou "local" (un seul process, pas de verrou)
+SCHEDULER_LOCK_MODE = os.getenv("SCHEDULER_LOCK_MODE", "postgres")
+
+
+class AdvisoryLeader:
+    """
+    Élection d'un leader entre les workers via un verrou consultatif Postgres.
+    Le worker qui obtient le verrou le garde sur une connexion dédiée tant
+    qu'il vit ; si le process meurt, Postgres libère le verrou et un autre
+    worker le récupère à la prochaine échéance.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.key = zlib.crc32(name.encode("utf-8"))
+        self._conn: Optional[AsyncConnection] = None
+        self._lock = asyncio.Lock()
+
+    def _local_mode(self) -> bool:
+        return SCHEDULER_LOCK_MODE == "local" or engine.dialect.name != "postgresql"
+
+    async def is_leader(self) -> bool:
+        if self._local_mode():
+            return True
+
+        async with self._lock:
+            # Déjà leader : on vérifie que la connexion (donc le verrou) est vivante
+            if self._conn is not None:
+                try:
+                    await self._conn.execute(text("SELECT 1"))
+                    await self._conn.commit()
+                    return True
+                except Exception:
+                    logger.warning(f"[scheduler] Connexion du leader '{self.name}' perdue.")
+                    await self._discard()
+
+            conn = await engine.connect()
+            try:
+                acquired = (
+                    await conn.execute(
+                        text("SELECT pg_try_advisory_lock(:key)"), {"key": self.key}
+                    )
+                ).scalar()
+                # le verrou est au niveau session : on ne garde pas de transaction ouverte
+                await conn.commit()
+            except Exception:
+                await conn.close()
+                raise
+
+            if not acquired:
+                await conn.close()
+                return False
+
+            self._conn = conn
+            logger.info(f"[scheduler] Ce worker est leader pour '{self.name}'.")
+            return True
+
+    async def _discard(self):
+        # invalidate() ferme la connexion physique : le verrou ne peut pas
+        # retourner dans le pool avec elle
+        conn, self._conn = self._conn, None
+        if conn is not None:
+            try:
+                await conn.invalidate()
+                await conn.close()
+            except Exception:
+                pass
+
+    async def release(self):
+        """Libère le verrou (arrêt du serveur)."""
+        async with self._lock:
+            if self._conn is None:
+                return
+            try:
+                await self._conn.execute(
+                    text("SELECT pg_advisory_unlock(:key)"), {"key": self.key}
+                )
+                await self._conn.commit()
+            except Exception:
+                pass
+            await self._discard()
+
+
+scheduler_leader = AdvisoryLeader("blackcoin:scheduler")
+
+
+async def run_as_leader(job_name: str, job: Callable[[], Awaitable[None]]) -> bool:
+    """Exécute `job` seulement si ce worker est leader. Retourne True si exécuté."""
+    try:
+        if not await scheduler_leader.is_leader():
+            logger.info(f"[scheduler] '{job_name}' ignoré : un autre worker est leader.")
+            return False
+    except Exception as e:
+        logger.error(f"[scheduler] Élection impossible pour '{job_name}' : {e}")
+        return False
+
+    await job()
+    return True
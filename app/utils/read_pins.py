@@ -0,0 +1,74 @@
+# app/utils/read_pins.py
+
+# Lecture de ses propres écritures (réplique) :
+# après un commit qui touche un utilisateur, ses lectures restent sur le primaire
+# pendant REPLICA_PIN_SECONDS (couvre le retard de réplication).
+#
+# Utilisateurs écrits, collectés dans session.info puis épinglés au commit :
+# - objets ORM flushés portant un user_id (ou User lui-même)
+# - écritures Core : mark_user_written(db, user_id) — appelé par record_entry
+#   (toutes les primitives du journal) et par les upserts hors journal
+# Les pins sont par worker.
+
+import os
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.models import User
+from app.utils.ttl_cache import TTLCache
+
+REPLICA_PIN_SECONDS = float(os.getenv("REPLICA_PIN_SECONDS", 5))
+
+_WRITTEN_USERS_KEY = "written_user_ids"
+
+# user_id -> True tant que ses lectures doivent rester sur le primaire
+_pinned_users = TTLCache(ttl_seconds=REPLICA_PIN_SECONDS, max_size=100_000)
+
+
+def pin_user_reads(user_id: Optional[int]) -> None:
+    """Force les lectures de l'utilisateur sur le primaire pendant REPLICA_PIN_SECONDS."""
+    if user_id is not None:
+        _pinned_users.set(int(user_id), True)
+
+
+def is_pinned(user_id: Optional[int]) -> bool:
+    return user_id is not None and _pinned_users.get(int(user_id)) is not None
+
+
+def mark_user_written(db, user_id: Optional[int]) -> None:
+    """Écriture Core sur `user_id` dans la transaction de `db` : épinglé au commit."""
+    if user_id is not None:
+        db.info.setdefault(_WRITTEN_USERS_KEY, set()).add(int(user_id))
+
+
+# =========================================================
+# SUIVI DES ÉCRITURES (toutes sessions)
+# =========================================================
+
+def _written_user_id(obj) -> Optional[int]:
+    if isinstance(obj, User):
+        return obj.id
+    return getattr(obj, "user_id", None)
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_written_users(session: Session, flush_context):
+    # après le flush : les ids sont attribués, new/dirty/deleted reflètent encore ce qui a été écrit
+    written = session.info.setdefault(_WRITTEN_USERS_KEY, set())
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        user_id = _written_user_id(obj)
+        if user_id is not None:
+            written.add(user_id)
+
+
+@event.listens_for(Session, "after_commit")
+def _pin_written_users(session: Session):
+    for user_id in session.info.pop(_WRITTEN_USERS_KEY, ()):
+        pin_user_reads(user_id)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_written_users(session: Session, previous_transaction):
+    session.info.pop(_WRITTEN_USERS_KEY, None)
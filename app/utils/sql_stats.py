@@ -0,0 +1,182 @@
+# app/utils/sql_stats.py
+import logging
+import os
+import time
+from contextvars import ContextVar
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.exc import DisconnectionError, TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from app.utils.metrics import counter, gauge, histogram
+
+logger = logging.getLogger("app.sql")
+
+# 🐢 Seuil du journal des requêtes lentes (ms)
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", 200))
+
+# Longueur max du SQL journalisé
+_SQL_PREVIEW_CHARS = 500
+
+db_query_seconds = histogram("db_query_duration_seconds", "Durée des requêtes SQL.")
+db_slow_queries = counter("db_slow_queries_total", "Requêtes SQL au-dessus de SLOW_QUERY_MS.")
+db_pool_wait_seconds = histogram(
+    "db_pool_checkout_wait_seconds",
+    "Attente d'une connexion du pool.",
+    buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0),
+)
+db_pool_timeouts = counter("db_pool_timeouts_total", "Checkouts abandonnés après pool_timeout.")
+
+
+class QueryStats:
+    """Statistiques SQL d'une requête HTTP (objet mutable partagé via contextvar)."""
+
+    __slots__ = ("count", "total_ms", "slowest_ms", "slowest_sql")
+
+    def __init__(self):
+        self.count = 0
+        self.total_ms = 0.0
+        self.slowest_ms = 0.0
+        self.slowest_sql: Optional[str] = None
+
+    def record(self, statement: str, elapsed_ms: float):
+        self.count += 1
+        self.total_ms += elapsed_ms
+        if elapsed_ms > self.slowest_ms:
+            self.slowest_ms = elapsed_ms
+            self.slowest_sql = statement
+
+
+current_query_stats: ContextVar[Optional[QueryStats]] = ContextVar("current_query_stats", default=None)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get("query_start_time")
+    if not starts:
+        return
+    elapsed = time.perf_counter() - starts.pop()
+    elapsed_ms = elapsed * 1000
+
+    db_query_seconds.observe(elapsed)
+
+    stats = current_query_stats.get()
+    if stats is not None:
+        stats.record(statement, elapsed_ms)
+
+    if elapsed_ms >= SLOW_QUERY_MS:
+        db_slow_queries.inc()
+        logger.warning(f"[sql] Requête lente ({elapsed_ms:.1f} ms) : {statement[:_SQL_PREVIEW_CHARS]}")
+
+
+def _handle_error(exception_context):
+    # requête en échec : on dépile son horodatage
+    conn = exception_context.connection
+    if conn is not None:
+        starts = conn.info.get("query_start_time")
+        if starts:
+            starts.pop()
+
+
+def instrument_engine(engine) -> None:
+    """Branche les événements SQLAlchemy sur le moteur (async ou sync)."""
+    sync_engine = getattr(engine, "sync_engine", engine)
+    event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(sync_engine, "handle_error", _handle_error)
+
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """Pool async qui mesure l'attente de chaque checkout (et les timeouts)."""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            db_pool_timeouts.inc()
+            raise
+        finally:
+            db_pool_wait_seconds.observe(time.perf_counter() - started)
+
+
+# =========================================================
+# SANTÉ DU POOL : ping après inactivité + télémétrie
+# =========================================================
+
+db_pool_pings = counter("db_pool_pings_total", "Pings de vivacité au checkout.")
+db_pool_disconnects = counter("db_pool_disconnects_total", "Connexions mortes détectées au checkout.")
+
+# Pools suivis (nom -> pool), lus à l'export
+_pools: dict = {}
+
+
+def _pool_gauge(attribute: str):
+    return lambda: {(name,): getattr(pool, attribute)() for name, pool in _pools.items()}
+
+
+gauge("db_pool_size", "Connexions persistantes configurées.", _pool_gauge("size"), ("pool",))
+gauge("db_pool_checked_out", "Connexions actuellement empruntées.", _pool_gauge("checkedout"), ("pool",))
+gauge("db_pool_checked_in", "Connexions libres dans le pool.", _pool_gauge("checkedin"), ("pool",))
+gauge("db_pool_overflow", "Connexions en débordement (max_overflow).", _pool_gauge("overflow"), ("pool",))
+
+
+def install_pool_liveness(engine, idle_seconds: float) -> None:
+    """
+    Ping au checkout seulement si la connexion est restée inactive plus de `idle_seconds`
+    (remplace pool_pre_ping, qui coûte un aller-retour à chaque checkout).
+    Connexion morte : DisconnectionError -> le pool en ouvre une autre.
+    """
+    sync_engine = getattr(engine, "sync_engine", engine)
+    dialect = sync_engine.dialect
+
+    @event.listens_for(sync_engine, "checkin")
+    def _on_checkin(dbapi_connection, connection_record):
+        connection_record.info["checked_in_at"] = time.monotonic()
+
+    @event.listens_for(sync_engine, "checkout")
+    def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+        checked_in_at = connection_record.info.get("checked_in_at")
+        if checked_in_at is None or time.monotonic() - checked_in_at < idle_seconds:
+            return
+
+        db_pool_pings.inc()
+        try:
+            alive = dialect.do_ping(dbapi_connection)
+        except Exception:
+            alive = False
+
+        if not alive:
+            db_pool_disconnects.inc()
+            raise DisconnectionError("Connexion inactive morte, remplacement.")
+
+
+def track_pool(name: str, engine) -> None:
+    """Expose l'état du pool du moteur dans les gauges et pool_stats()."""
+    _pools[name] = engine.pool
+
+
+def pool_stats() -> dict:
+    """Télémétrie des pools (endpoint /metrics/pool)."""
+    wait = db_pool_wait_seconds.snapshot() or {"count": 0, "sum": 0.0}
+    return {
+        "pools": {
+            name: {
+                "size": pool.size(),
+                "checked_out": pool.checkedout(),
+                "checked_in": pool.checkedin(),
+                "overflow": pool.overflow(),
+                "timeout_seconds": pool.timeout(),
+            }
+            for name, pool in _pools.items()
+        },
+        "checkouts": wait["count"],
+        "avg_wait_ms": round(wait["sum"] * 1000 / wait["count"], 3) if wait["count"] else 0,
+        "timeouts": db_pool_timeouts.total(),
+        "pings": db_pool_pings.total(),
+        "disconnects": db_pool_disconnects.total(),
+    }
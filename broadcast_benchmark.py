@@ -0,0 +1,98 @@
+# broadcast_benchmark.py
+# 📏 Coût CPU de la diffusion d'une partie selon le nombre de spectateurs :
+# une boucle + une sérialisation par spectateur (ancien /tradegame/ws/progress)
+# vs une boucle par partie (BroadcastHub) qui distribue la même frame à tous.
+#
+#   python broadcast_benchmark.py --subscribers 1,100,1000 --frames 500
+#
+# Aucun réseau ni base : l'envoi WebSocket est remplacé par la lecture de la file.
+import argparse
+import asyncio
+import json
+import math
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(__file__))
+
+from app.services.game_broadcast import BroadcastHub, END_OF_STREAM
+
+
+def _frame(i: int) -> dict:
+    # même forme qu'un point de contrôle de progress_frames
+    return {"multiplier": round(math.exp(0.06 * i / 10), 2), "elapsed": i / 10}
+
+
+async def _frames(count: int):
+    for i in range(count):
+        await asyncio.sleep(0)  # laisse les spectateurs vider leur file entre deux frames
+        yield _frame(i)
+    yield {"event": "crash", "final_multiplier": 2.0}
+
+
+async def per_client(subscribers: int, frames: int) -> dict:
+    """Ancien modèle : chaque spectateur fait tourner sa boucle et sérialise lui-même."""
+    serialized = 0
+
+    async def client():
+        nonlocal serialized
+        async for frame in _frames(frames):
+            json.dumps(frame)
+            serialized += 1
+
+    await asyncio.gather(*(client() for _ in range(subscribers)))
+    return {"serialized": serialized, "delivered": serialized, "dropped": 0}
+
+
+async def shared(subscribers: int, frames: int) -> dict:
+    """Une boucle par partie, frame sérialisée une fois, file bornée par spectateur."""
+    hub = BroadcastHub("benchmark")
+    delivered = 0
+
+    async def client(sub):
+        nonlocal delivered
+        while await sub.queue.get() is not END_OF_STREAM:
+            delivered += 1
+
+    subs = [hub.join("game", lambda: _frames(frames))[1] for _ in range(subscribers)]
+    await asyncio.gather(*(client(sub) for sub in subs))
+
+    stats = hub.stats()
+    return {"serialized": stats["frames_sent"], "delivered": delivered, "dropped": stats["dropped"]}
+
+
+async def measure(mode: str, fn, subscribers: int, frames: int) -> dict:
+    cpu, wall = time.process_time(), time.perf_counter()
+    result = await fn(subscribers, frames)
+    cpu, wall = time.process_time() - cpu, time.perf_counter() - wall
+
+    return {
+        "mode": mode,
+        "subscribers": subscribers,
+        "cpu_ms": round(cpu * 1000, 1),
+        "cpu_us_per_frame": round(cpu * 1e6 / (frames + 1), 1),
+        "cpu_us_per_delivery": round(cpu * 1e6 / max(result["delivered"], 1), 2),
+        "wall_ms": round(wall * 1000, 1),
+        **result,
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="CPU de diffusion : boucle par spectateur vs boucle partagée.")
+    parser.add_argument("--subscribers", default="1,100,1000")
+    parser.add_argument("--frames", type=int, default=500, help="frames par partie")
+    args = parser.parse_args()
+
+    for n in (int(s) for s in args.subscribers.split(",")):
+        for mode, fn in (("per_client", per_client), ("shared", shared)):
+            r = await measure(mode, fn, n, args.frames)
+            print(
+                f"📊 {r['mode']:>10}  spectateurs={r['subscribers']:>5}  cpu={r['cpu_ms']:>9} ms  "
+                f"{r['cpu_us_per_delivery']:>7} µs/envoi  sérialisations={r['serialized']:>7}  "
+                f"abandons={r['dropped']}"
+            )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,94 @@
+# coalescer_benchmark.py
+# 📏 Débit des crédits de points : un commit par crédit vs credit_coalescer.
+# Rejoue N crédits concurrents (cashouts de jeux) sur des utilisateurs existants.
+#
+#   python coalescer_benchmark.py --credits 5000 --concurrency 200 --users 100 --confirm
+#
+# ⚠️ ÉCRIT en base (balance + journal) : base de staging uniquement (--confirm obligatoire).
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+from statistics import quantiles
+
+sys.path.append(os.path.dirname(__file__))
+
+from sqlalchemy import text
+
+from app.database import AsyncSessionLocal, engine
+from app.services.credit_coalescer import credit_coalescer
+from app.services.ledger import upsert_balance
+
+
+async def _sample_user_ids(limit: int) -> list:
+    async with engine.connect() as conn:
+        rows = await conn.execute(text("SELECT id FROM users ORDER BY random() LIMIT :n"), {"n": limit})
+        return [r[0] for r in rows]
+
+
+async def _direct_credit(user_id: int, points: int):
+    # chemin d'origine : une transaction par crédit
+    async with AsyncSessionLocal() as db:
+        await upsert_balance(db, user_id, points, "benchmark")
+        await db.commit()
+
+
+async def _coalesced_credit(user_id: int, points: int):
+    await credit_coalescer.credit(user_id, points, "benchmark")
+
+
+async def run(mode: str, credit_fn, user_ids: list, credits: int, concurrency: int) -> dict:
+    latencies = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with semaphore:
+            started = time.perf_counter()
+            await credit_fn(random.choice(user_ids), 1)
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(credits)))
+    duration = time.perf_counter() - started
+
+    p95 = quantiles(latencies, n=20)[-1] if len(latencies) >= 20 else None
+    return {
+        "mode": mode,
+        "credits_per_second": round(credits / duration, 1),
+        "p95_ms": round(p95 * 1000, 2) if p95 is not None else None,
+        "duration_seconds": round(duration, 2),
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Débit des crédits : direct vs regroupés.")
+    parser.add_argument("--credits", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--users", type=int, default=100, help="utilisateurs distincts crédités")
+    parser.add_argument("--confirm", action="store_true", help="accepte l'écriture en base")
+    args = parser.parse_args()
+
+    if not args.confirm:
+        print("❌ Ce benchmark écrit en base : relancer avec --confirm (staging uniquement).")
+        return
+
+    user_ids = await _sample_user_ids(args.users)
+    if not user_ids:
+        print("❌ Aucun utilisateur en base.")
+        return
+
+    for mode, fn in (("direct", _direct_credit), ("coalesced", _coalesced_credit)):
+        result = await run(mode, fn, user_ids, args.credits, args.concurrency)
+        print(
+            f"📊 {result['mode']:>9} : {result['credits_per_second']:>8} crédits/s  "
+            f"p95={result['p95_ms']} ms  ({result['duration_seconds']}s)"
+        )
+
+    print(f"🧮 Regroupement : {credit_coalescer.stats()}")
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
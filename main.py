@@ -14,11 +14,16 @@ from fastapi.staticfiles import StaticFiles
 from app.database import engine, Base, AsyncSessionLocal
 from app.services.addtasks import add_sample_tasks
 from app.tasks.reset_daily_tasks import start_daily_reset_task  # ✅ seul import correct
+from app.tasks.convert_bonus_daily import start_daily_bonus_conversion_task
+from app.tasks.scheduler import scheduler_leader
+from app.middleware.idempotency import IdempotencyMiddleware
+from app.middleware.sql_stats import SQLStatsMiddleware
+from app.middleware.route_metrics import RouteMetricsMiddleware
 from app.routes import cashmoney  # ✅ ajouter ceci avec les autres imports
 
 from app.routes import (
     welcome, wallet, balance, user_profile, eligibility,
-    mining, minhistory, tasks, tradegame, bonus, actions
+    mining, minhistory, tasks, tradegame, bonus, actions, metrics
 )
 from app.routers import auth, auth_login, friends, luckygame
 from app.utils import cookies
@@ -53,6 +58,12 @@ if not origins:
 
 logger.info(f"🌍 CORS Origins autorisées : {origins}")
 
+# 📈 Statistiques SQL par requête (au plus près des routes)
+app.add_middleware(SQLStatsMiddleware)
+
+# 🔁 Idempotence (à l'intérieur du CORS : les réponses rejouées gardent les en-têtes CORS)
+app.add_middleware(IdempotencyMiddleware)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=origins,
@@ -61,6 +72,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# ⏱️ Latence par route (le plus à l'extérieur : inclut tous les middlewares)
+app.add_middleware(RouteMetricsMiddleware)
+
 # -----------------------
 # Inclusion des routes
 # -----------------------
@@ -81,6 +95,7 @@ app.include_router(minhistory.router, prefix="/minhistory", tags=["Historique Mi
 app.include_router(tasks.router, prefix="/tasks", tags=["Tâches"])
 app.include_router(actions.router)
 app.include_router(eligibility.router)  # ✅ airdrop check
+app.include_router(metrics.router)  # 📈 /metrics (Prometheus)
 
 # -----------------------
 # Fichiers statiques
@@ -121,3 +136,19 @@ async def startup():
         logger.info("♻️ Tâche de reset quotidienne démarrée (5 min loop pour test).")
     except Exception as e:
         logger.error(f"❌ Impossible de lancer le reset quotidien : {e}")
+
+    # 4️⃣ Conversion quotidienne des bonus
+    try:
+        asyncio.create_task(start_daily_bonus_conversion_task())
+        logger.info("💱 Tâche de conversion quotidienne des bonus démarrée.")
+    except Exception as e:
+        logger.error(f"❌ Impossible de lancer la conversion des bonus : {e}")
+
+
+# -----------------------
+# Shutdown
+# -----------------------
+@app.on_event("shutdown")
+async def shutdown():
+    # 🔓 libère le verrou de leader pour qu'un autre worker le reprenne
+    await scheduler_leader.release()
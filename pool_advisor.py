@@ -0,0 +1,145 @@
+# pool_advisor.py
+# 📏 Dimensionnement du pool : rejoue un mélange de requêtes de lecture
+# représentatif des routes chaudes, pour plusieurs tailles de pool,
+# et recommande la plus petite taille qui atteint ~95 % du meilleur débit.
+#
+#   python pool_advisor.py --sizes 5,10,20,30 --concurrency 100 --duration 20
+#   python pool_advisor.py --mix mix.json     # {"catalog": 5, "mining_status": 30, ...}
+#
+# Lecture seule : aucune écriture en base. Le résultat vaut pour UN worker ;
+# avec N workers, prévoir N x DB_POOL_SIZE connexions côté Postgres.
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from statistics import quantiles
+
+sys.path.append(os.path.dirname(__file__))
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.database import DATABASE_URL
+
+# 🔹 Requêtes par route (équivalents SQL des handlers GET les plus appelés)
+QUERIES = {
+    "catalog": "SELECT * FROM actions ORDER BY id",
+    "tasks": "SELECT * FROM tasks ORDER BY id",
+    "mining_status": "SELECT * FROM user_mining_stats WHERE user_id = :user_id",
+    "mining_history": (
+        "SELECT * FROM mining_history WHERE user_id = :user_id "
+        "ORDER BY created_at DESC, id DESC LIMIT 50"
+    ),
+    "balance": "SELECT * FROM balance WHERE user_id = :user_id",
+    "bonus": "SELECT * FROM bonus WHERE user_id = :user_id",
+}
+
+# 🎯 Poids par défaut (part relative du trafic)
+DEFAULT_MIX = {
+    "catalog": 10,
+    "tasks": 10,
+    "mining_status": 35,
+    "mining_history": 15,
+    "balance": 20,
+    "bonus": 10,
+}
+
+
+async def _sample_user_ids(engine, limit: int = 1000) -> list:
+    async with engine.connect() as conn:
+        rows = await conn.execute(text("SELECT id FROM users ORDER BY random() LIMIT :n"), {"n": limit})
+        return [r[0] for r in rows] or [1]
+
+
+async def run_size(size: int, mix: dict, user_ids: list, concurrency: int,
+                   duration: float, app_ms: float) -> dict:
+    """Charge le pool `size` pendant `duration` secondes avec `concurrency` clients."""
+    engine = create_async_engine(DATABASE_URL, pool_size=size, max_overflow=0, pool_timeout=60)
+    Session = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    names = list(mix)
+    weights = [mix[n] for n in names]
+    statements = {n: text(QUERIES[n]) for n in names}
+    latencies, waits = [], []
+    errors = 0
+    deadline = time.perf_counter() + duration
+
+    async def client():
+        nonlocal errors
+        while time.perf_counter() < deadline:
+            name = random.choices(names, weights)[0]
+            started = time.perf_counter()
+            try:
+                async with Session() as db:
+                    conn = await db.connection()  # checkout
+                    waits.append(time.perf_counter() - started)
+                    await conn.execute(statements[name], {"user_id": random.choice(user_ids)})
+                    # travail applicatif pendant que la session est tenue (comme un handler)
+                    if app_ms:
+                        await asyncio.sleep(app_ms / 1000)
+            except Exception:
+                errors += 1
+                continue
+            latencies.append(time.perf_counter() - started)
+
+    try:
+        await asyncio.gather(*(client() for _ in range(concurrency)))
+    finally:
+        await engine.dispose()
+
+    p95 = quantiles(latencies, n=20)[-1] if len(latencies) >= 20 else None
+    return {
+        "pool_size": size,
+        "requests": len(latencies),
+        "throughput": round(len(latencies) / duration, 1),
+        "p95_ms": round(p95 * 1000, 2) if p95 is not None else None,
+        "avg_wait_ms": round(sum(waits) * 1000 / len(waits), 2) if waits else None,
+        "errors": errors,
+    }
+
+
+def recommend(results: list, tolerance: float = 0.95) -> dict:
+    """Plus petit pool qui atteint `tolerance` x le meilleur débit."""
+    best = max(r["throughput"] for r in results)
+    return min(
+        (r for r in results if r["throughput"] >= best * tolerance),
+        key=lambda r: r["pool_size"],
+    )
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Recommandation de DB_POOL_SIZE par test de charge.")
+    parser.add_argument("--sizes", default="5,10,15,20,30,40")
+    parser.add_argument("--concurrency", type=int, default=100, help="clients simultanés (≈ requêtes en cours)")
+    parser.add_argument("--duration", type=float, default=15, help="secondes par taille")
+    parser.add_argument("--app-ms", type=float, default=2, help="temps applicatif par requête, session tenue")
+    parser.add_argument("--mix", help="fichier JSON {route: poids}")
+    args = parser.parse_args()
+
+    mix = DEFAULT_MIX
+    if args.mix:
+        with open(args.mix, encoding="utf-8") as f:
+            mix = {k: v for k, v in json.load(f).items() if k in QUERIES}
+
+    probe = create_async_engine(DATABASE_URL)
+    user_ids = await _sample_user_ids(probe)
+    await probe.dispose()
+
+    results = []
+    for size in (int(s) for s in args.sizes.split(",")):
+        result = await run_size(size, mix, user_ids, args.concurrency, args.duration, args.app_ms)
+        results.append(result)
+        print(
+            f"📊 pool={result['pool_size']:>3}  {result['throughput']:>8} req/s  "
+            f"p95={result['p95_ms']} ms  attente={result['avg_wait_ms']} ms  erreurs={result['errors']}"
+        )
+
+    best = recommend(results)
+    print(f"✅ Recommandation : DB_POOL_SIZE={best['pool_size']} ({best['throughput']} req/s, p95={best['p95_ms']} ms)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,78 @@
+# tests/test_hot_query_indexes.py
+# EXPLAIN des requêtes par utilisateur les plus fréquentes : chacune doit passer par un index.
+# Nécessite une base Postgres migrée (alembic upgrade head) :
+#   TEST_DATABASE_URL=postgresql+asyncpg://... python -m pytest tests/test_hot_query_indexes.py
+import asyncio
+import json
+import os
+
+import pytest
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+TEST_DATABASE_URL = os.getenv("TEST_DATABASE_URL")
+
+pytestmark = pytest.mark.skipif(not TEST_DATABASE_URL, reason="TEST_DATABASE_URL non défini")
+
+# (requête, index attendu) — mêmes filtres que les handlers
+HOT_QUERIES = [
+    ("SELECT * FROM minagetem WHERE user_id = 1 AND claimed = false",
+     "ix_minagetem_user_id_unclaimed"),
+    ("SELECT * FROM mining_history WHERE user_id = 1 ORDER BY created_at DESC, id DESC LIMIT 50",
+     "ix_mining_history_user_id_created_at"),
+    ("SELECT task_id, started_at, completed FROM user_tasks WHERE user_id = 1",
+     "uq_user_tasks_user_id_task_id"),
+    ("SELECT * FROM user_daily_tasks WHERE user_pack_id = 1",
+     "ix_user_daily_tasks_user_pack_id"),
+    ("SELECT * FROM user_daily_tasks WHERE user_id = 1",
+     "ix_user_daily_tasks_user_id"),
+    ("SELECT * FROM daily_tasks WHERE pack_id = 1",
+     "ix_daily_tasks_pack_id"),
+    ("SELECT * FROM friends WHERE user_id = 1 AND status = 'accepted'",
+     "ix_friends_user_id_status"),
+    ("SELECT * FROM friends WHERE friend_id = 1",
+     "ix_friends_friend_id"),
+    ("SELECT * FROM user_packs WHERE user_id = 1 AND pack_id = 1",
+     "ix_user_packs_user_id_pack_id"),
+    ("SELECT * FROM user_actions WHERE user_id = 1 AND action_id = 1",
+     "ix_user_actions_user_id_action_id"),
+    ("SELECT * FROM promo_codes WHERE user_id = 1",
+     "ix_promo_codes_user_id"),
+]
+
+
+def _index_names(plan: dict) -> set:
+    names = set()
+    if "Index Name" in plan:
+        names.add(plan["Index Name"])
+    for child in plan.get("Plans", []):
+        names |= _index_names(child)
+    return names
+
+
+async def _explain_all() -> dict:
+    engine = create_async_engine(TEST_DATABASE_URL)
+    plans = {}
+    try:
+        async with engine.connect() as conn:
+            # tables de test quasi vides : sans ça le planner préfère toujours un seq scan
+            await conn.execute(text("SET enable_seqscan = off"))
+            for sql, _index in HOT_QUERIES:
+                raw = (await conn.execute(text(f"EXPLAIN (FORMAT JSON) {sql}"))).scalar_one()
+                plan = raw if isinstance(raw, list) else json.loads(raw)
+                plans[sql] = plan[0]["Plan"]
+    finally:
+        await engine.dispose()
+    return plans
+
+
+def test_hot_queries_use_an_index():
+    plans = asyncio.run(_explain_all())
+
+    missing = [
+        (sql, index, sorted(_index_names(plans[sql])))
+        for sql, index in HOT_QUERIES
+        if index not in _index_names(plans[sql])
+    ]
+    assert not missing, missing
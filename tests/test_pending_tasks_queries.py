@@ -0,0 +1,66 @@
+# tests/test_pending_tasks_queries.py
+# Régression : GET /tasks/me/pending = UNE requête SQL (catalogue en cache + UserTask de l'utilisateur).
+import asyncio
+from datetime import datetime
+
+import pytest
+
+pytest.importorskip("aiosqlite")
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.dependencies.auth import Principal
+from app.models import Task, UserTask
+from app.routes.tasks import get_my_pending_tasks
+from app.services.catalog_cache import task_catalog
+from app.utils.sql_stats import QueryStats, current_query_stats, instrument_engine
+
+
+async def _count_queries(session_factory, user) -> tuple[int, list]:
+    stats = QueryStats()
+    token = current_query_stats.set(stats)
+    try:
+        async with session_factory() as db:
+            pending = await get_my_pending_tasks(db=db, current_user=user)
+    finally:
+        current_query_stats.reset(token)
+    return stats.count, pending
+
+
+async def _scenario():
+    engine = create_async_engine("sqlite+aiosqlite://")
+    instrument_engine(engine)
+    async with engine.begin() as conn:
+        await conn.run_sync(Task.metadata.create_all, tables=[Task.__table__, UserTask.__table__])
+
+    session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with session_factory() as db:
+        db.add_all([
+            Task(id=i, title=f"Tâche {i}", link=f"https://example.com/{i}", validation_code="CODE",
+                 reward_points=10 * i)
+            for i in range(1, 6)
+        ])
+        db.add(UserTask(user_id=1, task_id=2, completed=True, started_at=datetime.utcnow()))
+        await db.commit()
+
+    user = Principal(1, "user@example.com", "user", True, True, None)
+    task_catalog.invalidate()
+
+    # 1er appel : chargement du catalogue + UserTask
+    cold, _ = await _count_queries(session_factory, user)
+    # appels suivants : UserTask seulement
+    warm, pending = await _count_queries(session_factory, user)
+    again, _ = await _count_queries(session_factory, user)
+
+    await engine.dispose()
+    task_catalog.invalidate()
+    return cold, warm, again, pending
+
+
+def test_pending_tasks_runs_one_query_per_call():
+    cold, warm, again, pending = asyncio.run(_scenario())
+
+    assert cold == 2
+    assert warm == 1
+    assert again == 1
+    assert [t["id"] for t in pending] == [1, 3, 4, 5]